@@ -0,0 +1,41 @@
+-- ============================================================
+-- Geography Dimension (Suburb -> Province -> Country)
+-- ============================================================
+-- Purpose: One row per suburb with its province and country IDs/names, so
+-- reports can group by country or province without multi-hop joins.
+-- Path_Key is '<country_id>/<province_id>/<suburb_id>' (empty segment when
+-- a legacy suburb has no province) and supports prefix rollups, e.g.
+-- WHERE Path_Key LIKE '12/%' for every suburb in country 12.
+--
+-- This file is the only definition of Geography_Dim. It is run:
+--   * after schema.sql on a new database,
+--   * by every script from generate_location_data_complete.py (which
+--     embeds this file and refreshes the view afterwards),
+--   * after partition_suburb_by_country.sql, which has to drop the view.
+--
+-- Staleness: a materialized view is a snapshot. Edits made through the
+-- lookup API (Country/Province/Suburb create/update/delete) are NOT
+-- reflected until the next refresh:
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY Geography_Dim;
+--
+-- Safe to run more than once.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS Geography_Dim AS
+SELECT
+    s.ID AS Suburb_ID,
+    s.Name AS Suburb_Name,
+    p.ID AS Province_ID,
+    p.Name AS Province_Name,
+    c.ID AS Country_ID,
+    c.Name AS Country_Name,
+    c.Code AS Country_Code,
+    COALESCE(c.ID::text, '') || '/' || COALESCE(p.ID::text, '') || '/' || s.ID::text AS Path_Key
+FROM Suburb s
+LEFT JOIN Province p ON s.province_id = p.ID
+LEFT JOIN Country c ON p.country_id = c.ID;
+
+-- Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_geography_dim_suburb ON Geography_Dim(Suburb_ID);
+CREATE INDEX IF NOT EXISTS idx_geography_dim_country_province ON Geography_Dim(Country_ID, Province_ID);
+CREATE INDEX IF NOT EXISTS idx_geography_dim_province ON Geography_Dim(Province_ID);
+CREATE INDEX IF NOT EXISTS idx_geography_dim_path_key ON Geography_Dim(Path_Key text_pattern_ops);
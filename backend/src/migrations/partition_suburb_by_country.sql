@@ -0,0 +1,273 @@
+-- ============================================================
+-- Country-Partitioned Suburb Table
+-- ============================================================
+-- Purpose: Split the Suburb lookup (the largest location table once the
+-- full world dataset is loaded) into one partition per country, so each
+-- country's suburbs live in their own heap and indexes: per-country
+-- reloads, VACUUM/ANALYZE and index maintenance only touch one partition.
+--
+-- Layout:
+--   Every country owns a fixed block of Suburb IDs:
+--       [Country.ID * 1000000, (Country.ID + 1) * 1000000)
+--   and Suburb is RANGE partitioned on ID along those blocks, i.e. one
+--   partition (suburb_c<Country.ID>) per country. Because the partition
+--   key is ID itself, PRIMARY KEY (ID) stays valid on the partitioned
+--   table and the existing foreign keys that reference Suburb(ID)
+--   (Imam_Profiles, Jumuah_Khutbah_Topic_Submission, Jumuah_Audio_Khutbah,
+--   Hardship_Relief, ...) keep working unchanged. A plain LIST/HASH
+--   partition on country_id would force (ID, country_id) keys and break
+--   those single-column foreign keys.
+--
+--   Suburbs without a province (and pre-existing rows whose province has
+--   no country) live in suburb_legacy, which owns IDs below 1000000 and
+--   keeps the old SERIAL behaviour. New suburbs with a province get their
+--   ID from suburb_next_id(province_id) (schema.sql), which draws from the
+--   country's sequence; the lookup API and the location generator use it.
+--
+-- Invariant (enforced by trg_suburb_unique_name):
+--   A suburb with an ID >= 1000000 lives in the block of its province's
+--   country. Moving a suburb to a province of another country is
+--   rejected, since its ID (referenced by foreign keys) would have to
+--   change; create it under the new province instead.
+--   Because of this, a suburb of country C can only be in suburb_c<C> or
+--   suburb_legacy, and per-country work only needs those two partitions:
+--       WHERE (ID < 1000000
+--              OR ID >= suburb_id_block(C) AND ID < suburb_id_block(C) + 1000000)
+--   The uniqueness trigger and the generated per-country inserts use
+--   exactly this predicate.
+--
+-- Tradeoffs:
+--   * Pruning needs that ID predicate. Queries that only filter on
+--     province_id, or join from Province / Imam_Profiles.suburb_id, probe
+--     the province_id index of every partition. Pruning on country_id
+--     would need it in the primary key, which the single-column foreign
+--     keys above cannot reference.
+--   * (Name, province_id) uniqueness can't be a single index across
+--     partitions, because it doesn't include the partition key. Each
+--     partition has its own unique index and trg_suburb_unique_name
+--     checks the country's partition plus suburb_legacy.
+--   * Converting renumbers every suburb that has a province into its
+--     country's block. Columns that reference Suburb(ID) are repointed if
+--     they have a foreign key or are one of the known suburb columns
+--     listed in Step 1 below; any other stored suburb IDs (exports,
+--     caches, external systems) are NOT updated.
+--
+-- Requires PostgreSQL 13+ (foreign keys referencing partitioned tables,
+-- row triggers on partitioned tables).
+-- Safe to run more than once: the conversion is skipped if Suburb is
+-- already partitioned.
+
+-- Partition naming helpers (used by generated location inserts)
+CREATE OR REPLACE FUNCTION suburb_partition_name(p_country_id BIGINT)
+RETURNS TEXT AS $$
+    SELECT 'suburb_c' || p_country_id::text;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION suburb_id_block(p_country_id BIGINT)
+RETURNS BIGINT AS $$
+    SELECT p_country_id * 1000000;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Create the partition, its unique index and its ID sequence for a country
+CREATE OR REPLACE FUNCTION ensure_suburb_partition(p_country_id BIGINT)
+RETURNS TEXT AS $$
+DECLARE
+    part_name TEXT := suburb_partition_name(p_country_id);
+    block_start BIGINT := suburb_id_block(p_country_id);
+BEGIN
+    IF to_regclass(part_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF Suburb FOR VALUES FROM (%s) TO (%s)',
+            part_name, block_start, block_start + 1000000
+        );
+        -- (Name, province_id) within this partition; trg_suburb_unique_name
+        -- covers duplicates across partitions
+        EXECUTE format('CREATE UNIQUE INDEX IF NOT EXISTS %I ON %I (Name, province_id)',
+            part_name || '_name_province_key', part_name);
+        EXECUTE format('COMMENT ON TABLE %I IS %L', part_name,
+            'Suburbs of country ' || COALESCE((SELECT Name FROM Country WHERE ID = p_country_id), p_country_id::text));
+    END IF;
+
+    IF to_regclass(part_name || '_id_seq') IS NULL THEN
+        EXECUTE format('CREATE SEQUENCE %I AS BIGINT MINVALUE %s MAXVALUE %s',
+            part_name || '_id_seq', block_start + 1, block_start + 999999);
+        EXECUTE format('SELECT setval(%L, MAX(ID)) FROM %I HAVING MAX(ID) IS NOT NULL',
+            part_name || '_id_seq', part_name);
+    END IF;
+
+    RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keeps every suburb in its province's country block and enforces
+-- (Name, province_id) uniqueness across that block and suburb_legacy.
+-- The advisory lock serializes concurrent inserts of the same name into
+-- the same province.
+CREATE OR REPLACE FUNCTION suburb_check_unique_name()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_country_id BIGINT;
+    v_block BIGINT;
+BEGIN
+    IF NEW.province_id IS NOT NULL THEN
+        SELECT country_id INTO v_country_id FROM Province WHERE ID = NEW.province_id;
+    END IF;
+    v_block := suburb_id_block(v_country_id);
+
+    IF NEW.ID >= 1000000 AND (v_block IS NULL OR NEW.ID < v_block OR NEW.ID >= v_block + 1000000) THEN
+        RAISE EXCEPTION 'suburb % (ID %) is outside the ID block of its province''s country', NEW.Name, NEW.ID
+            USING ERRCODE = 'check_violation',
+                  HINT = 'Suburbs can''t move to another country''s province; create the suburb under the new province instead.';
+    END IF;
+
+    IF NEW.province_id IS NULL THEN
+        RETURN NEW;  -- NULL provinces never conflicted under uq_suburb_province either
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtextextended(NEW.province_id::text || '/' || NEW.Name, 0));
+    IF EXISTS (
+        SELECT 1 FROM Suburb
+        WHERE province_id = NEW.province_id AND Name = NEW.Name AND ID <> NEW.ID
+        AND (ID < 1000000 OR ID >= v_block AND ID < v_block + 1000000)
+    ) THEN
+        RAISE EXCEPTION 'duplicate suburb % in province %', NEW.Name, NEW.province_id
+            USING ERRCODE = 'unique_violation', CONSTRAINT = 'uq_suburb_province';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    fk RECORD;
+    legacy_max BIGINT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'suburb'::regclass) THEN
+        RAISE NOTICE 'Suburb is already partitioned by country';
+        RETURN;
+    END IF;
+
+    -- Step 1: Remember and drop every foreign key that references Suburb(ID)
+    CREATE TEMP TABLE suburb_fk_refs ON COMMIT DROP AS
+    SELECT con.conname, con.conrelid::regclass::text AS table_name,
+           att.attname AS column_name, pg_get_constraintdef(con.oid) AS definition
+    FROM pg_constraint con
+    JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = con.conkey[1]
+    WHERE con.contype = 'f' AND con.confrelid = 'suburb'::regclass;
+
+    FOR fk IN SELECT * FROM suburb_fk_refs LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.table_name, fk.conname);
+    END LOOP;
+
+    -- Columns to repoint: every foreign key column plus the known suburb
+    -- columns, in case a database is missing one of their foreign keys
+    CREATE TEMP TABLE suburb_ref_columns ON COMMIT DROP AS
+    SELECT table_name, column_name FROM suburb_fk_refs
+    UNION
+    SELECT c.table_name, c.column_name
+    FROM information_schema.columns c
+    JOIN (VALUES
+        ('employee', 'suburb'),
+        ('imam_profiles', 'suburb_id'),
+        ('jumuah_khutbah_topic', 'town'),
+        ('jumuah_audio_khutbah', 'town'),
+        ('hardship_relief', 'area_of_residence')
+    ) AS known(table_name, column_name)
+        ON c.table_name = known.table_name AND c.column_name = known.column_name
+    WHERE c.table_schema = current_schema();
+
+    -- Step 2: Assign every suburb with a province an ID in its country's block
+    CREATE TEMP TABLE suburb_id_map ON COMMIT DROP AS
+    SELECT s.ID AS old_id,
+           CASE WHEN p.country_id IS NULL THEN s.ID
+                ELSE suburb_id_block(p.country_id) + ROW_NUMBER() OVER (PARTITION BY p.country_id ORDER BY s.ID)
+           END AS new_id
+    FROM Suburb s
+    LEFT JOIN Province p ON s.province_id = p.ID;
+
+    SELECT MAX(old_id) INTO legacy_max FROM suburb_id_map WHERE new_id = old_id;
+    IF legacy_max >= 1000000 THEN
+        RAISE EXCEPTION 'Suburb % has no province and an ID outside the legacy block', legacy_max;
+    END IF;
+
+    -- Step 3: Repoint referencing rows to the new IDs
+    FOR fk IN SELECT * FROM suburb_ref_columns LOOP
+        EXECUTE format(
+            'UPDATE %s t SET %I = m.new_id FROM suburb_id_map m WHERE t.%I = m.old_id AND m.new_id <> m.old_id',
+            fk.table_name, fk.column_name, fk.column_name
+        );
+    END LOOP;
+
+    -- Step 4: Swap in the partitioned table
+    ALTER TABLE Suburb
+    ADD COLUMN IF NOT EXISTS Latitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS Longitude DOUBLE PRECISION;
+
+    CREATE TEMP TABLE suburb_rows ON COMMIT DROP AS
+    SELECT m.new_id AS ID, s.Name, s.province_id, s.Latitude, s.Longitude,
+           s.Created_By, s.Created_At, s.Updated_By, s.Updated_At
+    FROM Suburb s
+    JOIN suburb_id_map m ON m.old_id = s.ID;
+
+    DROP MATERIALIZED VIEW IF EXISTS Geography_Dim;
+    DROP TABLE Suburb;
+
+    CREATE SEQUENCE IF NOT EXISTS suburb_legacy_id_seq AS BIGINT MINVALUE 1 MAXVALUE 999999;
+    PERFORM setval('suburb_legacy_id_seq', COALESCE(legacy_max, 1), legacy_max IS NOT NULL);
+
+    CREATE TABLE Suburb (
+        ID BIGINT NOT NULL DEFAULT nextval('suburb_legacy_id_seq'),
+        Name VARCHAR(255) NOT NULL,
+        province_id BIGINT,
+        Latitude DOUBLE PRECISION,
+        Longitude DOUBLE PRECISION,
+        Created_By VARCHAR(255),
+        Created_At TIMESTAMPTZ NOT NULL DEFAULT now(),
+        Updated_By VARCHAR(255),
+        Updated_At TIMESTAMPTZ NOT NULL DEFAULT now(),
+        CONSTRAINT suburb_pkey PRIMARY KEY (ID),
+        CONSTRAINT fk_suburb_province FOREIGN KEY (province_id) REFERENCES Province(ID)
+    ) PARTITION BY RANGE (ID);
+
+    CREATE TABLE suburb_legacy PARTITION OF Suburb FOR VALUES FROM (MINVALUE) TO (1000000);
+    CREATE UNIQUE INDEX IF NOT EXISTS suburb_legacy_name_province_key ON suburb_legacy (Name, province_id);
+    CREATE INDEX IF NOT EXISTS idx_suburb_province ON Suburb(province_id);
+    -- Nearest-suburb index only where earthdistance can be installed (see schema.sql)
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS cube;
+        CREATE EXTENSION IF NOT EXISTS earthdistance;
+        CREATE INDEX IF NOT EXISTS idx_suburb_earth ON Suburb USING gist (ll_to_earth(Latitude, Longitude))
+        WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL;
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'idx_suburb_earth not created, earthdistance unavailable: %', SQLERRM;
+    END;
+
+    PERFORM ensure_suburb_partition(ID) FROM Country ORDER BY ID;
+
+    INSERT INTO Suburb (ID, Name, province_id, Latitude, Longitude, Created_By, Created_At, Updated_By, Updated_At)
+    SELECT ID, Name, province_id, Latitude, Longitude, Created_By, Created_At, Updated_By, Updated_At FROM suburb_rows;
+
+    -- Sequences were created before the rows were copied; move them past the copied IDs
+    PERFORM setval(suburb_partition_name(c.ID) || '_id_seq', MAX(s.ID))
+    FROM Country c
+    JOIN Suburb s ON s.ID >= suburb_id_block(c.ID) AND s.ID < suburb_id_block(c.ID) + 1000000
+    GROUP BY c.ID;
+
+    -- Step 5: Restore the foreign keys against the partitioned table
+    FOR fk IN SELECT * FROM suburb_fk_refs LOOP
+        EXECUTE format('ALTER TABLE %s ADD CONSTRAINT %I %s', fk.table_name, fk.conname, fk.definition);
+    END LOOP;
+
+    RAISE NOTICE 'Suburb converted to country partitions (% foreign keys restored)', (SELECT COUNT(*) FROM suburb_fk_refs);
+END $$;
+
+DROP TRIGGER IF EXISTS trg_suburb_unique_name ON Suburb;
+CREATE TRIGGER trg_suburb_unique_name
+BEFORE INSERT OR UPDATE OF ID, Name, province_id ON Suburb
+FOR EACH ROW EXECUTE FUNCTION suburb_check_unique_name();
+
+-- Geography_Dim depends on Suburb, so the conversion drops it: run
+-- geography_dim.sql afterwards (location generator scripts already include it)
+
+COMMENT ON TABLE Suburb IS 'Suburb lookup, RANGE partitioned on ID in 1,000,000-ID blocks per Country (suburb_c<Country.ID>); suburb_legacy holds IDs below 1000000.';
+
+ANALYZE Suburb;
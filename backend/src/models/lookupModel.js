@@ -1,7 +1,199 @@
 const pool = require('../config/db');
 
+// Country/Province/Suburb are loaded in bulk by the location generator, which
+// stamps every load in Location_Dataset_Version and lists the added/removed/
+// renamed IDs in Location_Change_Log; edits through this model are stamped the
+// same way. Those tables are cached in-process and kept fresh by polling the
+// latest version ID.
+const LOCATION_TABLES = ['Country', 'Province', 'Suburb'];
+const LOCATION_VERSION_POLL_MS = 30 * 1000;
+const LOCATION_CACHE_MAX_AGE_MS = 10 * 60 * 1000;
+const LOCATION_PATCH_LIMIT = 1000;
+
+const locationCache = {
+  enabled: true,
+  version: null,
+  checkedAt: 0,
+  pendingCheck: null,
+  tables: {},
+  // Bumped whenever a table's cache is dropped, so a full load that started
+  // before the drop doesn't store rows from before the change
+  generations: {},
+};
+
+// Cached rows are always sorted here (never by the database collation), so
+// the order doesn't depend on whether the cache was fully loaded or patched
+const nameCollator = new Intl.Collator();
+const compareByName = (a, b) =>
+  nameCollator.compare(String(a.name), String(b.name)) || Number(a.id) - Number(b.id);
+
+const cachedLocationTable = (tableName) =>
+  LOCATION_TABLES.find((name) => name.toLowerCase() === String(tableName).toLowerCase()) || null;
+
+const dropLocationTable = (table) => {
+  delete locationCache.tables[table];
+  locationCache.generations[table] = (locationCache.generations[table] || 0) + 1;
+};
+
+const dropLocationTables = () => LOCATION_TABLES.forEach(dropLocationTable);
+
+const latestLocationVersion = async () => {
+  const res = await pool.query('SELECT COALESCE(MAX(ID), 0) AS version FROM Location_Dataset_Version');
+  return Number(res.rows[0].version);
+};
+
+const patchLocationCache = async (fromVersion, toVersion) => {
+  const res = await pool.query(
+    `SELECT Entity, Entity_ID, Change_Type FROM Location_Change_Log
+     WHERE Version_ID > $1 AND Version_ID <= $2 ORDER BY Version_ID, ID`,
+    [fromVersion, toVersion]
+  );
+  if (res.rows.length > LOCATION_PATCH_LIMIT) {
+    dropLocationTables();
+    return;
+  }
+
+  const changes = {};
+  for (const row of res.rows) {
+    const entry = (changes[row.entity] = changes[row.entity] || { refetch: new Set(), removed: new Set() });
+    const id = Number(row.entity_id);
+    if (row.change_type === 'removed') {
+      entry.removed.add(id);
+      entry.refetch.delete(id);
+    } else {
+      entry.refetch.add(id);
+      entry.removed.delete(id);
+    }
+  }
+
+  for (const [table, entry] of Object.entries(changes)) {
+    // A full load still in flight may predate these changes
+    const cached = locationCache.tables[table];
+    locationCache.generations[table] = (locationCache.generations[table] || 0) + 1;
+    if (!cached) continue;
+    entry.removed.forEach((id) => cached.rows.delete(id));
+    if (entry.refetch.size > 0) {
+      const fresh = await pool.query(`SELECT * FROM ${table} WHERE ID = ANY($1)`, [[...entry.refetch]]);
+      fresh.rows.forEach((row) => cached.rows.set(Number(row.id), row));
+    }
+    cached.sorted = null;
+  }
+};
+
+// Poll the version row at most once per LOCATION_VERSION_POLL_MS
+const refreshLocationCache = async () => {
+  if (Date.now() - locationCache.checkedAt < LOCATION_VERSION_POLL_MS) return;
+  if (!locationCache.pendingCheck) {
+    locationCache.pendingCheck = (async () => {
+      try {
+        const version = await latestLocationVersion();
+        if (locationCache.version === null || version < locationCache.version) {
+          dropLocationTables();
+        } else if (version > locationCache.version) {
+          await patchLocationCache(locationCache.version, version);
+        }
+        locationCache.version = version;
+        locationCache.enabled = true;
+        locationCache.checkedAt = Date.now();
+      } catch (err) {
+        // Location_Dataset_Version not created yet: serve these tables uncached
+        // and look for it again on the next poll
+        if (err.code === '42P01') {
+          locationCache.enabled = false;
+          locationCache.version = null;
+          dropLocationTables();
+          locationCache.checkedAt = Date.now();
+        } else {
+          throw err;
+        }
+      } finally {
+        locationCache.pendingCheck = null;
+      }
+    })();
+  }
+  await locationCache.pendingCheck;
+};
+
+const getCachedLocationRows = async (table, orderByName) => {
+  await refreshLocationCache();
+  if (!locationCache.enabled) return null;
+
+  let cached = locationCache.tables[table];
+  if (!cached || Date.now() - cached.loadedAt > LOCATION_CACHE_MAX_AGE_MS) {
+    const generation = locationCache.generations[table] || 0;
+    const res = await pool.query(`SELECT * FROM ${table}`);
+    cached = {
+      rows: new Map(res.rows.map((row) => [Number(row.id), row])),
+      sorted: null,
+      loadedAt: Date.now(),
+    };
+    // Rows are still returned to this caller, but only cached if nothing changed meanwhile
+    if ((locationCache.generations[table] || 0) === generation) {
+      locationCache.tables[table] = cached;
+    }
+  }
+  if (!cached.sorted) {
+    cached.sorted = [...cached.rows.values()].sort(compareByName);
+  }
+  return orderByName ? [...cached.sorted] : [...cached.rows.values()];
+};
+
+// API edits to the location tables are stamped like a generator load: a
+// Location_Dataset_Version row plus a Location_Change_Log entry, committed in
+// the same transaction as the edit, so other instances pick them up on their
+// next version poll instead of serving stale rows for up to
+// LOCATION_CACHE_MAX_AGE_MS
+const logLocationChange = async (client, table, change) => {
+  await client.query('SAVEPOINT location_version');
+  try {
+    const version = await client.query(
+      `INSERT INTO Location_Dataset_Version (Source, Created_By, Updated_By)
+       VALUES ('lookup_api', $1, $1) RETURNING ID`,
+      [change.by || 'system']
+    );
+    await client.query(
+      `INSERT INTO Location_Change_Log (Version_ID, Entity, Entity_ID, Change_Type, Old_Name, New_Name)
+       VALUES ($1, $2, $3, $4, $5, $6)`,
+      [version.rows[0].id, table, change.id, change.type, change.oldName ?? null, change.newName ?? null]
+    );
+    await client.query('RELEASE SAVEPOINT location_version');
+  } catch (err) {
+    // Version tables not created yet: caches are disabled then, so the edit
+    // itself still goes through
+    if (err.code !== '42P01') throw err;
+    await client.query('ROLLBACK TO SAVEPOINT location_version');
+  }
+};
+
+// Runs write(db) and, for location tables, logs the change it returns in the
+// same transaction. write resolves to { result, change }; change may be null.
+const writeLookup = async (tableName, write) => {
+  const table = cachedLocationTable(tableName);
+  if (!table) return (await write(pool)).result;
+
+  const client = await pool.connect();
+  try {
+    await client.query('BEGIN');
+    const { result, change } = await write(client);
+    if (change) await logLocationChange(client, table, change);
+    await client.query('COMMIT');
+    return result;
+  } catch (err) {
+    await client.query('ROLLBACK');
+    throw err;
+  } finally {
+    client.release();
+    dropLocationTable(table);
+  }
+};
+
 const lookupModel = {
   getAll: async (tableName, orderByName = false) => {
+    const cachedTable = cachedLocationTable(tableName);
+    if (cachedTable) {
+      const rows = await getCachedLocationRows(cachedTable, orderByName);
+      if (rows) return rows;
+    }
     const query = `SELECT * FROM ${tableName}${orderByName ? ' ORDER BY Name' : ''}`;
     const res = await pool.query(query);
     return res.rows;
@@ -13,30 +205,68 @@ const lookupModel = {
     return res.rows[0];
   },
 
-  create: async (tableName, fields) => {
-    const columns = Object.keys(fields).join(', ');
+  create: async (tableName, fields) => writeLookup(tableName, async (db) => {
+    const columns = Object.keys(fields);
     const values = Object.values(fields);
-    const placeholders = values.map((_, i) => `$${i + 1}`).join(', ');
-    const query = `INSERT INTO ${tableName} (${columns}) VALUES (${placeholders}) RETURNING *`;
-    const res = await pool.query(query, values);
-    return res.rows[0];
-  },
+    const placeholders = values.map((_, i) => `$${i + 1}`);
+
+    // Suburbs with a province take their ID from suburb_next_id() (schema.sql),
+    // which keeps them in their country's partition on the partitioned layout.
+    // Databases where schema.sql hasn't been re-run yet fall back to the default.
+    const provinceIndex = columns.findIndex((column) => column.toLowerCase() === 'province_id');
+    if (cachedLocationTable(tableName) === 'Suburb'
+      && provinceIndex >= 0 && values[provinceIndex] != null
+      && !columns.some((column) => column.toLowerCase() === 'id')) {
+      const fn = await db.query(`SELECT to_regprocedure('suburb_next_id(bigint)') IS NOT NULL AS present`);
+      if (fn.rows[0].present) {
+        columns.push('ID');
+        placeholders.push(`suburb_next_id($${provinceIndex + 1}::bigint)`);
+      }
+    }
+
+    const query = `INSERT INTO ${tableName} (${columns.join(', ')}) VALUES (${placeholders.join(', ')}) RETURNING *`;
+    const res = await db.query(query, values);
+    const row = res.rows[0];
+    return {
+      result: row,
+      change: row && { id: row.id, type: 'added', newName: row.name, by: row.created_by },
+    };
+  }),
+
+  update: async (tableName, id, fields) => writeLookup(tableName, async (db) => {
+    // Old name for the change log (locks the row until commit)
+    const before = cachedLocationTable(tableName)
+      ? (await db.query(`SELECT Name FROM ${tableName} WHERE ID = $1 FOR UPDATE`, [id])).rows[0]
+      : null;
 
-  update: async (tableName, id, fields) => {
     const setString = Object.keys(fields)
       .map((key, i) => `${key} = $${i + 1}`)
       .join(', ');
     const values = Object.values(fields);
     const query = `UPDATE ${tableName} SET ${setString} WHERE ID = $${values.length + 1} RETURNING *`;
-    const res = await pool.query(query, [...values, id]);
-    return res.rows[0];
-  },
+    const res = await db.query(query, [...values, id]);
+    const row = res.rows[0];
+    return {
+      result: row,
+      change: row && before && {
+        id: row.id,
+        type: before.name === row.name ? 'updated' : 'renamed',
+        oldName: before.name,
+        newName: row.name,
+        by: row.updated_by,
+      },
+    };
+  }),
 
-  delete: async (tableName, id) => {
-    const query = `DELETE FROM ${tableName} WHERE ID = $1`;
-    const res = await pool.query(query, [id]);
-    return res.rowCount > 0;
-  }
+  delete: async (tableName, id) => writeLookup(tableName, async (db) => {
+    const query = `DELETE FROM ${tableName} WHERE ID = $1 RETURNING *`;
+    const res = await db.query(query, [id]);
+    const row = res.rows[0];
+    return {
+      result: res.rowCount > 0,
+      change: row && { id: row.id, type: 'removed', oldName: row.name, by: row.updated_by },
+    };
+  })
 };
 
 module.exports = lookupModel;
@@ -1835,6 +1835,49 @@ CREATE TABLE IF NOT EXISTS Province (
     CONSTRAINT uq_province_country UNIQUE (Name, country_id)
 );
 
+-- Province subdivision code (e.g. 'GP'), used by generated Suburb inserts to resolve province_id
+ALTER TABLE Province
+ADD COLUMN IF NOT EXISTS Code VARCHAR(10);
+
+CREATE INDEX IF NOT EXISTS idx_province_country_code ON Province(country_id, Code);
+
+-- Location dataset version stamp and change feed (written by the location generator,
+-- polled by the backend to invalidate/patch its Country/Province/Suburb lookup cache)
+CREATE TABLE IF NOT EXISTS Location_Dataset_Version (
+    ID BIGSERIAL PRIMARY KEY,
+    Checksum VARCHAR(64),  -- NULL for single edits made through the lookup API
+    Source VARCHAR(50),
+    Country_Count INTEGER,
+    Province_Count INTEGER,
+    Suburb_Count INTEGER,
+    Created_By VARCHAR(255),
+    Created_At TIMESTAMPTZ NOT NULL DEFAULT now(),
+    Updated_By VARCHAR(255),
+    Updated_At TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS Location_Change_Log (
+    ID BIGSERIAL PRIMARY KEY,
+    Version_ID BIGINT NOT NULL,
+    Entity VARCHAR(20) NOT NULL,
+    Entity_ID BIGINT NOT NULL,
+    Change_Type VARCHAR(10) NOT NULL,
+    Old_Name VARCHAR(255),
+    New_Name VARCHAR(255),
+    Created_At TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT fk_location_change_log_version FOREIGN KEY (Version_ID) REFERENCES Location_Dataset_Version(ID) ON DELETE CASCADE,
+    CONSTRAINT chk_location_change_log_entity CHECK (Entity IN ('Country', 'Province', 'Suburb')),
+    CONSTRAINT chk_location_change_log_type CHECK (Change_Type IN ('added', 'removed', 'renamed', 'updated'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_location_change_log_version ON Location_Change_Log(Version_ID);
+
+-- Tables created before lookup API edits were logged
+ALTER TABLE Location_Dataset_Version ALTER COLUMN Checksum DROP NOT NULL;
+ALTER TABLE Location_Change_Log DROP CONSTRAINT IF EXISTS chk_location_change_log_type;
+ALTER TABLE Location_Change_Log ADD CONSTRAINT chk_location_change_log_type
+    CHECK (Change_Type IN ('added', 'removed', 'renamed', 'updated'));
+
 -- Add province_id to existing Suburb table (safe migration)
 DO $$
 BEGIN
@@ -1898,6 +1941,46 @@ BEGIN
     END IF;
 END $$;
 
+-- Suburb coordinates (populated by the location generator) with an earthdistance
+-- GiST index for great-circle nearest-N lookups:
+--   ORDER BY ll_to_earth(Latitude, Longitude) <-> ll_to_earth(lat, lon)
+ALTER TABLE Suburb
+ADD COLUMN IF NOT EXISTS Latitude DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS Longitude DOUBLE PRECISION;
+
+-- cube/earthdistance are contrib extensions that may be missing or need
+-- privileges we don't have; the schema then loads without the index
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS cube;
+    CREATE EXTENSION IF NOT EXISTS earthdistance;
+    CREATE INDEX IF NOT EXISTS idx_suburb_earth ON Suburb USING gist (ll_to_earth(Latitude, Longitude))
+    WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL;
+    DROP INDEX IF EXISTS idx_suburb_location;
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'idx_suburb_earth not created, earthdistance unavailable: %', SQLERRM;
+END $$;
+
+-- ID for a new suburb. On the country-partitioned layout
+-- (migrations/partition_suburb_by_country.sql) it comes from the province's
+-- country sequence, so the row lands in that country's partition; otherwise
+-- (or without a province / country) it is the table's normal sequence.
+CREATE OR REPLACE FUNCTION suburb_next_id(p_province_id BIGINT)
+RETURNS BIGINT AS $$
+DECLARE
+    v_country_id BIGINT;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'suburb'::regclass) THEN
+        RETURN nextval(pg_get_serial_sequence('suburb', 'id'));
+    END IF;
+    SELECT country_id INTO v_country_id FROM Province WHERE ID = p_province_id;
+    IF v_country_id IS NULL THEN
+        RETURN nextval('suburb_legacy_id_seq');
+    END IF;
+    RETURN nextval((ensure_suburb_partition(v_country_id) || '_id_seq')::regclass);
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================================
 -- SAFE MIGRATION: Add new columns to Imam_Profiles table
 -- ============================================================
@@ -3731,6 +3814,16 @@ WHERE NOT EXISTS (
 -- - Suburbs: Curated dataset for major provinces/cities
 -- ============================================================
 
+-- ============================================================
+-- GEOGRAPHY DIMENSION (Suburb -> Province -> Country)
+-- ============================================================
+-- The Geography_Dim materialized view (one row per suburb with its province
+-- and country, used by reports) is defined once, in
+-- backend/src/migrations/geography_dim.sql: run it after this file. The
+-- location generator embeds it in every load script and refreshes the view.
+-- It is a snapshot: edits made through the lookup API are not visible in it
+-- until REFRESH MATERIALIZED VIEW CONCURRENTLY Geography_Dim; is run.
+
 -- ============================================================
 -- NEW TABLES FROM API SNAPSHOT (Status: In Progress)
 -- ============================================================
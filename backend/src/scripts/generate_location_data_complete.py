@@ -4,10 +4,23 @@ Generate SQL INSERT statements for Country, Province, and Suburb tables
 by fetching ALL data from public APIs (not just major countries).
 """
 
+import argparse
+import csv
+import glob
+import hashlib
+import heapq
 import json
+import math
+import mmap
+import os
+import re
+import tempfile
+import threading
 import urllib.request
 import urllib.parse
 import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
 
 # API endpoints
@@ -15,139 +28,1089 @@ COUNTRIES_API = "https://restcountries.com/v3.1/all?fields=name,cca2,cca3"
 STATES_API_BASE = "https://countriesnow.space/api/v0.1/countries/states"
 CITIES_API_BASE = "https://countriesnow.space/api/v0.1/countries/state/cities"
 
-def fetch_json(url, retries=3, delay=1):
-    """Fetch JSON data from URL with retry logic"""
+# Where each table's rows come from, per --source (shown in the generated SQL)
+DATA_SOURCES = {
+    'api': {
+        'countries': "REST Countries API (https://restcountries.com)",
+        'provinces': "CountriesNow API (https://countriesnow.space)",
+        'suburbs': "CountriesNow API (https://countriesnow.space)",
+    },
+    'geonames': {
+        'countries': "GeoNames countryInfo.txt (https://www.geonames.org)",
+        'provinces': "GeoNames admin1CodesASCII.txt (https://www.geonames.org)",
+        'suburbs': "GeoNames places dump (https://www.geonames.org)",
+    },
+}
+
+# Schema the generated SQL is loaded into (used by the pre-load validator)
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'schema', 'schema.sql')
+
+# Migration that converts Suburb into per-country partitions (--partition-suburbs)
+SUBURB_PARTITION_MIGRATION = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations', 'partition_suburb_by_country.sql')
+
+# Single definition of the Geography_Dim materialized view
+GEOGRAPHY_DIM_MIGRATION = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations', 'geography_dim.sql')
+
+# Suburb rows per generated INSERT/UPDATE statement (statements never span countries)
+SUBURB_BATCH_ROWS = 5000
+
+# Tail-latency controls for fetch_json (set from the command line)
+FETCH_SETTINGS = {
+    'timeout': 30,             # socket timeout for a single HTTP request
+    'request_budget': 90.0,    # total seconds one fetch_json() call may spend on attempts, hedges and backoff
+    'hedge': False,            # send a duplicate request when the first is slower than the observed p95
+    'hedge_min_delay': 0.25,   # never hedge sooner than this, even if p95 is very low
+    'hedge_min_samples': 20,   # successful requests needed before p95 is trusted
+    'crawl_deadline': None,    # time.monotonic() after which no new requests are started
+}
+
+# Crawl concurrency and the statistics used to schedule it (set from the command line)
+CRAWL_SETTINGS = {
+    'workers': 1,              # concurrent country/province requests
+    'stats': {'countries': {}, 'provinces': {}},  # statistics from earlier runs (load_crawl_stats)
+}
+
+FETCH_METRICS = {
+    'requests': 0,
+    'latencies': [],           # end-to-end latency of successful fetch_json() calls
+    'primary_latencies': [],   # latency of first (unhedged) requests - what a crawl without hedging waits for;
+                               # failures count too, and abandoned ones are censored at abandonment
+    'hedges_sent': 0,
+    'hedges_won': 0,
+    'budget_exhausted': 0,
+    'skipped_after_deadline': 0,
+}
+
+_fetch_pool = None               # hedging thread pool, created by start_fetch_pool()
+_metrics_lock = threading.Lock()
+_stats_lock = threading.Lock()   # CRAWL_SETTINGS['stats'] while countries are crawled in parallel
+
+def start_fetch_pool():
+    """Create the thread pool hedged requests run on (call once, before crawling)"""
+    global _fetch_pool
+    if _fetch_pool is None:
+        _fetch_pool = ThreadPoolExecutor(max_workers=max(16, 2 * CRAWL_SETTINGS['workers']), thread_name_prefix='fetch')
+
+def _fetch_once(url, timeout):
+    """Perform a single HTTP request; returns the decoded JSON body and its size in bytes"""
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        body = response.read()
+    return json.loads(body.decode('utf-8')), len(body)
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+def crawl_deadline_reached():
+    """True once the global crawl deadline (--crawl-deadline) has passed"""
+    deadline = FETCH_SETTINGS['crawl_deadline']
+    return deadline is not None and time.monotonic() >= deadline
+
+def _time_left(budget_end):
+    """Seconds left before the request budget or the crawl deadline runs out"""
+    deadline = FETCH_SETTINGS['crawl_deadline']
+    if deadline is not None:
+        budget_end = min(budget_end, deadline)
+    return budget_end - time.monotonic()
+
+def _hedge_delay():
+    """Delay before sending a duplicate request: p95 of recent first-request latency"""
+    samples = FETCH_METRICS['primary_latencies'][-500:]
+    if len(samples) < FETCH_SETTINGS['hedge_min_samples']:
+        return None
+    return max(FETCH_SETTINGS['hedge_min_delay'], _percentile(samples, 95))
+
+def _fetch_attempt(url, timeout):
+    """
+    One fetch attempt within 'timeout' seconds. With hedging enabled, a
+    duplicate request is sent if the first hasn't answered after the p95
+    delay, and whichever returns first wins.
+    """
+    started = time.monotonic()
+
+    if not FETCH_SETTINGS['hedge'] or _fetch_pool is None:
+        try:
+            return _fetch_once(url, timeout)
+        finally:
+            with _metrics_lock:
+                FETCH_METRICS['primary_latencies'].append(time.monotonic() - started)
+
+    # The first request's time is recorded once it finishes, successful or not.
+    # If the attempt ends while it is still running (a hedge won, or the attempt
+    # timed out) the time so far is recorded as a censored sample, replaced by
+    # the real latency if the request finishes later.
+    primary_sample = {'index': None, 'final': False}
+
+    def record_primary(future=None):
+        elapsed = time.monotonic() - started
+        with _metrics_lock:
+            if primary_sample['final']:
+                return
+            samples = FETCH_METRICS['primary_latencies']
+            if primary_sample['index'] is None:
+                primary_sample['index'] = len(samples)
+                samples.append(elapsed)
+            elif future is not None:
+                samples[primary_sample['index']] = elapsed
+            primary_sample['final'] = future is not None
+
+    primary = _fetch_pool.submit(_fetch_once, url, timeout)
+    primary.add_done_callback(record_primary)
+    try:
+        return _wait_for_hedged(url, timeout, started, primary)
+    finally:
+        record_primary()
+
+def _wait_for_hedged(url, timeout, started, primary):
+    """Wait for 'primary', sending a hedge after the p95 delay; returns the first successful result"""
+    pending = {primary}
+
+    hedge_after = _hedge_delay()
+    if hedge_after is not None and hedge_after < timeout:
+        done, _ = wait(pending, timeout=hedge_after)
+        if not done:
+            pending.add(_fetch_pool.submit(_fetch_once, url, timeout - hedge_after))
+            with _metrics_lock:
+                FETCH_METRICS['hedges_sent'] += 1
+
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=max(0, started + timeout - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None:
+                if future is not primary:
+                    with _metrics_lock:
+                        FETCH_METRICS['hedges_won'] += 1
+                return future.result()
+            error = future.exception()
+            if isinstance(error, urllib.error.HTTPError) and error.code == 404:
+                raise error
+    # Slow requests still running are abandoned; they end on their own socket timeout
+    raise error or TimeoutError(f"no response within {timeout:.1f}s")
+
+def fetch_json(url, retries=3, delay=1, stats=None):
+    """
+    Fetch JSON data from URL with retry logic, a deadline budget and optional hedging.
+    If 'stats' is given, the response size and latency are added to its 'bytes'/'seconds',
+    and 'failed' is set when no answer was obtained (a 404 is an answer: no data).
+    """
+    if stats is not None:
+        stats['failed'] = True  # cleared once the server answers
+    if crawl_deadline_reached():
+        with _metrics_lock:
+            FETCH_METRICS['skipped_after_deadline'] += 1
+        return None
+
+    with _metrics_lock:
+        FETCH_METRICS['requests'] += 1
+    started = time.monotonic()
+    budget_end = started + FETCH_SETTINGS['request_budget']
+
     for attempt in range(retries):
+        time_left = _time_left(budget_end)
+        if time_left <= 0:
+            break
         try:
-            with urllib.request.urlopen(url, timeout=30) as response:
-                return json.loads(response.read().decode('utf-8'))
+            result, size = _fetch_attempt(url, min(FETCH_SETTINGS['timeout'], time_left))
+            latency = time.monotonic() - started
+            with _metrics_lock:
+                FETCH_METRICS['latencies'].append(latency)
+            if stats is not None:
+                stats['bytes'] = stats.get('bytes', 0) + size
+                stats['seconds'] = stats.get('seconds', 0) + latency
+                stats['failed'] = False
+            return result
         except urllib.error.HTTPError as e:
             if e.code == 404:
+                if stats is not None:
+                    stats['failed'] = False
                 return None  # Not found, skip
-            if attempt < retries - 1:
-                time.sleep(delay * (attempt + 1))
+            backoff = delay * (attempt + 1)
+            if attempt < retries - 1 and backoff < _time_left(budget_end):
+                time.sleep(backoff)
                 continue
             print(f"    HTTP Error {e.code} for {url}")
             return None
         except Exception as e:
-            if attempt < retries - 1:
-                time.sleep(delay * (attempt + 1))
+            backoff = delay * (attempt + 1)
+            if attempt < retries - 1 and backoff < _time_left(budget_end):
+                time.sleep(backoff)
                 continue
             print(f"    Error: {e}")
             return None
+
+    with _metrics_lock:
+        FETCH_METRICS['budget_exhausted'] += 1
+    print(f"    Deadline budget exhausted for {url}")
     return None
 
+def print_fetch_metrics():
+    """Print request latency percentiles and hedging/deadline counters"""
+    def describe(values):
+        if not values:
+            return "n/a"
+        return (f"p50 {_percentile(values, 50):.2f}s  p95 {_percentile(values, 95):.2f}s  "
+                f"p99 {_percentile(values, 99):.2f}s  max {max(values):.2f}s")
+
+    print(f"\nFetch metrics ({FETCH_METRICS['requests']} requests):")
+    print(f"  - Effective latency:     {describe(FETCH_METRICS['latencies'])}")
+    print(f"  - First-request latency: {describe(FETCH_METRICS['primary_latencies'])}"
+          f"{'  (incl. failed/abandoned)' if FETCH_SETTINGS['hedge'] else ''}")
+    if FETCH_SETTINGS['hedge']:
+        print(f"  - Hedged requests: {FETCH_METRICS['hedges_sent']} sent, {FETCH_METRICS['hedges_won']} won")
+    print(f"  - Deadline budget exhausted: {FETCH_METRICS['budget_exhausted']}")
+    if FETCH_METRICS['skipped_after_deadline']:
+        print(f"  - Requests skipped after crawl deadline: {FETCH_METRICS['skipped_after_deadline']}")
+
 def escape_sql_string(s):
     """Escape single quotes for SQL"""
     if s is None:
         return ""
     return str(s).replace("'", "''")
 
-def generate_country_inserts(countries):
-    """Generate SQL INSERT statements for countries"""
+# ============================================================
+# CRAWL: build the in-memory location dataset
+# ============================================================
+#
+# dataset = {
+#     'countries': [{'name', 'code'}],
+#     'provinces': [{'country_code', 'name', 'code'}],
+#     'suburbs':   [{'country_code', 'province_name', 'province_code', 'name',
+#                    optional 'latitude', 'longitude'}],
+# }
+# Values are kept raw (unescaped) so they can be validated against the
+# schema before being rendered to SQL.
+
+def extract_states(states_data):
+    """Extract the list of states from a CountriesNow states response"""
+    states = []
+    if isinstance(states_data, dict):
+        if states_data.get('data'):
+            if isinstance(states_data['data'], dict) and states_data['data'].get('states'):
+                states = states_data['data']['states']
+            elif isinstance(states_data['data'], list):
+                states = states_data['data']
+        elif states_data.get('states'):
+            states = states_data['states']
+    elif isinstance(states_data, list):
+        states = states_data
+    return states
+
+def extract_cities(cities_data):
+    """Extract the list of cities from a CountriesNow cities response"""
+    cities = []
+    if isinstance(cities_data, dict):
+        if cities_data.get('data'):
+            if isinstance(cities_data['data'], list):
+                cities = cities_data['data']
+    elif isinstance(cities_data, list):
+        cities = cities_data
+    return cities
+
+def collect_countries(countries_data):
+    """Convert the REST Countries response into country rows"""
+    countries = []
+    for country in countries_data:
+        name = country.get('name', {}).get('common', '')
+        code = country.get('cca2', '')
+        if name and code:
+            countries.append({'name': name, 'code': code})
+    return countries
+
+# ============================================================
+# CRAWL SCHEDULING: largest-first across workers using earlier runs' statistics
+# ============================================================
+#
+# Every API crawl records the city count and the response size/latency of
+# its requests in a stats file (--crawl-stats):
+#   {"countries": {"US": {"provinces", "states_bytes", "states_seconds",
+#                         "cities", "bytes", "seconds"}},
+#    "provinces": {"US|Texas": {"cities", "bytes", "seconds"}}}
+# The next crawl estimates every request from it and hands the requests to
+# the workers longest-first (LPT), so city-heavy countries and states start
+# early instead of stretching the tail of the run; shard crawls likewise
+# take their countries largest-first. Requests without latency history are
+# estimated from their expected response size (a least-squares fit of
+# latency on bytes; city counts are converted to bytes), then from their
+# country's average latency, then from the median.
+
+CRAWL_STATS_FILE = "location_crawl_stats.json"
+DEFAULT_JOB_SECONDS = 1.0      # estimate when there is no history at all
+STATS_SMOOTHING = 0.5          # weight of the latest run in the stored latency
+
+def shard_stats_path(path, shard):
+    """Crawl statistics file of one shard, next to the shared file"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard[0]}of{shard[1]}{ext}"
+
+def _modified_time(path):
+    """mtime of a file, 0 if it vanished"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+def load_crawl_stats(path):
+    """
+    Load crawl statistics from earlier runs: the shared file plus any per-shard
+    files, oldest first so newer measurements win. Missing or unreadable files
+    are skipped (with a warning), so a bad file only costs scheduling quality.
+    """
+    stats = {'countries': {}, 'provinces': {}}
+    if not path:
+        return stats
+
+    root, ext = os.path.splitext(path)
+    files = [path] + glob.glob(f"{glob.escape(root)}.shard*of*{ext}")
+    for stats_file in sorted(files, key=_modified_time):
+        try:
+            with open(stats_file, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            sections = [(section, dict(loaded.get(section, {}))) for section in stats]
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"WARNING: Ignoring unreadable crawl statistics {stats_file}: {e}")
+            continue
+        for section, entries in sections:
+            stats[section].update(entries)
+    return stats
+
+def save_crawl_stats(stats, path, shard=None):
+    """
+    Write crawl statistics for the next run. A shard writes only its own
+    countries to its own file (shard_stats_path), so shards running at the
+    same time never overwrite each other's entries; load_crawl_stats merges
+    them. The file is written to a unique temp file and renamed into place.
+    """
+    if shard:
+        shard_index, shard_count = shard
+        target = shard_stats_path(path, shard)
+        data = {
+            section: {key: entry for key, entry in stats[section].items()
+                      if shard_of(key.split('|', 1)[0], shard_count) == shard_index}
+            for section in ('countries', 'provinces')
+        }
+    else:
+        target = path
+        data = load_crawl_stats(path)
+        for section in ('countries', 'provinces'):
+            data[section].update(stats[section])
+    data['updated'] = datetime.now().isoformat()
+
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(os.path.abspath(target)),
+                                     prefix=os.path.basename(target) + '.', suffix='.tmp', delete=False) as f:
+        try:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, target)
+    return target
+
+def province_stats_key(country_code, province_name):
+    """Key of a province in the crawl statistics"""
+    return f"{country_code}|{province_name}"
+
+def record_crawl_stats(section, key, measured):
+    """Merge one measurement into the crawl statistics; latencies are smoothed across runs"""
+    with _stats_lock:
+        entry = CRAWL_SETTINGS['stats'][section].setdefault(key, {})
+        for field, value in measured.items():
+            if field.endswith('seconds'):
+                if entry.get(field) is not None:
+                    value = STATS_SMOOTHING * value + (1 - STATS_SMOOTHING) * entry[field]
+                value = round(value, 3)
+            entry[field] = value
+
+def _stats_entries(section):
+    """Snapshot of a statistics section that is safe to iterate while other threads record"""
+    with _stats_lock:
+        return [dict(entry) for entry in CRAWL_SETTINGS['stats'][section].values()]
+
+def _median_seconds(section, field):
+    """Median of a latency field over all known entries, used for unknown jobs"""
+    values = [e[field] for e in _stats_entries(section) if e.get(field) is not None]
+    median = _percentile(values, 50)
+    return DEFAULT_JOB_SECONDS if median is None else median
+
+def _fit_latency(section, size_field, seconds_field):
+    """
+    Least-squares fit of seconds = base + rate * response bytes over the known
+    entries, so jobs without latency history can be estimated from their size.
+    Returns None until there are two entries of different sizes.
+    """
+    points = [(e[size_field], e[seconds_field]) for e in _stats_entries(section)
+              if e.get(size_field) is not None and e.get(seconds_field) is not None]
+    if len(points) < 2:
+        return None
+    mean_size = sum(x for x, _ in points) / len(points)
+    mean_seconds = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_size) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    rate = max(0.0, sum((x - mean_size) * (y - mean_seconds) for x, y in points) / variance)
+    base = max(0.0, mean_seconds - rate * mean_size)
+    return lambda size: base + rate * size
+
+def _bytes_per_city():
+    """Average cities response size per city, to turn city counts into expected bytes"""
+    entries = [e for e in _stats_entries('provinces') if e.get('cities') and e.get('bytes')]
+    cities = sum(e['cities'] for e in entries)
+    return sum(e['bytes'] for e in entries) / cities if cities else None
+
+def estimate_country_seconds(countries):
+    """Expected duration of each country's states request"""
+    known = CRAWL_SETTINGS['stats']['countries']
+    model = _fit_latency('countries', 'states_bytes', 'states_seconds')
+    fallback = _median_seconds('countries', 'states_seconds')
+    estimates = []
+    for country in countries:
+        entry = known.get(country['code'], {})
+        if entry.get('states_seconds') is not None:
+            estimates.append(entry['states_seconds'])
+        elif entry.get('states_bytes') is not None and model:
+            estimates.append(model(entry['states_bytes']))
+        else:
+            estimates.append(fallback)
+    return estimates
+
+def estimate_country_crawl_seconds(countries):
+    """Expected duration of crawling each country completely (states plus all its cities)"""
+    known = CRAWL_SETTINGS['stats']['countries']
+    model = _fit_latency('countries', 'bytes', 'seconds')
+    fallback = _median_seconds('countries', 'seconds')
+    estimates = []
+    for country, states_seconds in zip(countries, estimate_country_seconds(countries)):
+        entry = known.get(country['code'], {})
+        if entry.get('seconds') is not None:
+            estimates.append(states_seconds + entry['seconds'])
+        elif entry.get('bytes') is not None and model:
+            estimates.append(states_seconds + model(entry['bytes']))
+        else:
+            estimates.append(states_seconds + fallback)
+    return estimates
+
+def estimate_province_seconds(provinces):
+    """
+    Expected duration of each province's cities request: its own latency
+    history, else a size-based estimate from its (or its country's average)
+    response size or city count, else the country's average latency.
+    """
+    known = CRAWL_SETTINGS['stats']
+    model = _fit_latency('provinces', 'bytes', 'seconds')
+    bytes_per_city = _bytes_per_city()
+    fallback = _median_seconds('provinces', 'seconds')
+    estimates = []
+    for province in provinces:
+        entry = known['provinces'].get(province_stats_key(province['country_code'], province['name']), {})
+        country = known['countries'].get(province['country_code'], {})
+        if entry.get('seconds') is not None:
+            estimates.append(entry['seconds'])
+            continue
+
+        size = entry.get('bytes')
+        if size is None and entry.get('cities') is not None and bytes_per_city:
+            size = entry['cities'] * bytes_per_city
+        if size is None and country.get('provinces'):
+            if country.get('bytes') is not None:
+                size = country['bytes'] / country['provinces']
+            elif country.get('cities') is not None and bytes_per_city:
+                size = country['cities'] / country['provinces'] * bytes_per_city
+
+        if size is not None and model:
+            estimates.append(model(size))
+        elif country.get('seconds') is not None and country.get('provinces'):
+            estimates.append(country['seconds'] / country['provinces'])
+        else:
+            estimates.append(fallback)
+    return estimates
+
+def lpt_makespan(estimates, workers):
+    """Makespan of handing the jobs longest-first to whichever worker is free first"""
+    loads = [0.0] * max(1, workers)
+    for estimate in sorted(estimates, reverse=True):
+        heapq.heapreplace(loads, loads[0] + estimate)
+    return max(loads)
+
+def format_duration(seconds):
+    """Format seconds as m:ss or h:mm:ss"""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def run_largest_first(jobs, estimates, worker, label, verbose=True, progress_every=20, workers=None, on_done=None):
+    """
+    Run worker(job) for every job on 'workers' (default CRAWL_SETTINGS['workers'])
+    threads, longest estimated job first, printing the estimated remaining time
+    as jobs finish. on_done(job, result) is called in the calling thread as each
+    job finishes. Returns the results in job order; jobs reached after the crawl
+    deadline get None.
+    """
+    workers = max(1, workers or CRAWL_SETTINGS['workers'])
+    if verbose:
+        print(f"  Scheduling {len(jobs)} {label} longest-first on {workers} worker(s), "
+              f"estimated {format_duration(lpt_makespan(estimates, workers))}")
+
+    def timed(index):
+        if crawl_deadline_reached():
+            return index, None, None
+        started = time.monotonic()
+        result = worker(jobs[index])
+        return index, result, time.monotonic() - started
+
+    results = [None] * len(jobs)
+    remaining = sum(estimates)
+    estimated_done = actual_done = 0.0
+    skipped = 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crawl') as pool:
+        # The pool's queue is FIFO, so submitting longest-first is LPT scheduling
+        futures = [pool.submit(timed, i) for i in sorted(range(len(jobs)), key=lambda i: -estimates[i])]
+        for done, future in enumerate(as_completed(futures), 1):
+            index, results[index], duration = future.result()
+            if on_done:
+                on_done(jobs[index], results[index])
+            remaining -= estimates[index]
+            if duration is None:
+                skipped += 1
+            else:
+                estimated_done += estimates[index]
+                actual_done += duration
+            if verbose and done % progress_every == 0 and done < len(jobs):
+                # Scale the estimates by how this run compares to them so far
+                pace = actual_done / estimated_done if estimated_done else 1.0
+                print(f"  Progress: {done}/{len(jobs)} {label} processed, "
+                      f"~{format_duration(max(0, remaining) * pace / workers)} remaining")
+
+    if skipped:
+        print(f"  Crawl deadline reached - {skipped}/{len(jobs)} {label} not fetched")
+    if verbose:
+        print(f"  Finished {len(jobs) - skipped} {label} in {format_duration(time.monotonic() - started)}")
+    return results
+
+def fetch_country_states(country):
+    """Fetch one country's provinces; returns (provinces, request stats)"""
+    provinces = []
+    measured = {}
+    encoded_country = urllib.parse.quote(country['name'])
+    states = extract_states(fetch_json(f"{STATES_API_BASE}?country={encoded_country}", stats=measured))
+
+    if states:
+        for state in states:
+            # Handle both dict and string formats
+            if isinstance(state, dict):
+                state_name = state.get('name', '')
+                state_code = state.get('state_code', state.get('code', ''))
+            else:
+                state_name = str(state)
+                state_code = ""
+
+            if state_name:
+                provinces.append({
+                    'country_code': country['code'],
+                    'name': state_name,
+                    'code': state_code or ''
+                })
+
+        # Small delay to avoid rate limiting (reduced for faster processing)
+        time.sleep(0.05)
+
+    return provinces, measured
+
+def fetch_province_cities(job):
+    """Fetch one province's cities; 'job' is (province, country name). Returns (cities, request stats)"""
+    province, country_name = job
+    measured = {}
+    encoded_country = urllib.parse.quote(country_name)
+    encoded_province = urllib.parse.quote(province['name'])
+    cities = extract_cities(fetch_json(f"{CITIES_API_BASE}?country={encoded_country}&state={encoded_province}", stats=measured))
+
+    # Rate limiting (reduced delay for faster processing)
+    time.sleep(0.1)
+    return [str(city) for city in cities if city], measured
+
+def fetch_provinces(countries, verbose=True, failed=None, workers=None):
+    """
+    Fetch provinces/states for ALL countries. If 'failed' is a list, the codes of
+    countries whose states request got no answer (error, budget or deadline) are
+    appended to it.
+    """
+    provinces = []
+    countries_with_provinces = 0
+    failed_countries = []
+
+    if verbose:
+        print(f"Fetching provinces/states for {len(countries)} countries...")
+
+    results = run_largest_first(countries, estimate_country_seconds(countries), fetch_country_states,
+                                'countries', verbose=verbose, progress_every=10, workers=workers)
+
+    for country, result in zip(countries, results):
+        if result is None:
+            if failed is not None:
+                failed.append(country['code'])
+            continue  # not fetched before the crawl deadline
+        country_provinces, measured = result
+        if measured['failed'] and failed is not None:
+            failed.append(country['code'])
+        if 'bytes' in measured:
+            record_crawl_stats('countries', country['code'], {
+                'provinces': len(country_provinces),
+                'states_bytes': measured['bytes'],
+                'states_seconds': measured['seconds'],
+            })
+        if country_provinces:
+            countries_with_provinces += 1
+            provinces.extend(country_provinces)
+        else:
+            failed_countries.append(country['name'])
+
+    if verbose:
+        print(f"\n[OK] Fetched provinces for {countries_with_provinces} countries")
+        print(f"     Total provinces: {len(provinces)}")
+        if failed_countries:
+            print(f"     Countries without province data: {len(failed_countries)}")
+
+    return provinces
+
+def fetch_suburbs(countries, provinces, verbose=True, failed=None, workers=None):
+    """
+    Fetch cities/suburbs for ALL provinces. If 'failed' is a list, the
+    'country|province' keys of provinces whose cities request got no answer
+    are appended to it.
+    """
+    suburbs = []
+    provinces_processed = 0
+    provinces_with_cities = 0
+    country_names = {c['code']: c['name'] for c in countries}
+    country_totals = {}
+
+    if verbose:
+        print(f"\nFetching cities/suburbs for all provinces...")
+        print("This may take a while as we fetch cities for each province...")
+
+    jobs = [(province, country_names[province['country_code']]) for province in provinces]
+    results = run_largest_first(jobs, estimate_province_seconds(provinces), fetch_province_cities,
+                                'provinces', verbose=verbose, workers=workers)
+
+    for province, result in zip(provinces, results):
+        totals = country_totals.setdefault(province['country_code'], {'cities': 0, 'bytes': 0, 'seconds': 0.0, 'complete': True})
+        key = province_stats_key(province['country_code'], province['name'])
+        if result is None:
+            totals['complete'] = False  # not fetched before the crawl deadline
+            if failed is not None:
+                failed.append(key)
+            continue
+        provinces_processed += 1
+        cities, measured = result
+        if measured['failed'] and failed is not None:
+            failed.append(key)
+
+        if 'bytes' in measured:
+            record_crawl_stats('provinces', key, {
+                'cities': len(cities),
+                'bytes': measured['bytes'],
+                'seconds': measured['seconds'],
+            })
+            totals['bytes'] += measured['bytes']
+            totals['seconds'] += measured['seconds']
+
+        if cities:
+            provinces_with_cities += 1
+            totals['cities'] += len(cities)
+            for city in cities:
+                suburbs.append({
+                    'country_code': province['country_code'],
+                    'province_name': province['name'],
+                    'province_code': province['code'],
+                    'name': city
+                })
+
+    # Country totals only describe a country whose provinces were all fetched
+    for country_code, totals in country_totals.items():
+        if totals.pop('complete'):
+            record_crawl_stats('countries', country_code, totals)
+
+    if verbose:
+        print(f"\n[OK] Processed {provinces_processed} provinces")
+        print(f"     Provinces with cities: {provinces_with_cities}")
+        print(f"     Total cities/suburbs: {len(suburbs)}")
+
+    return suburbs
+
+def _location_key(*parts):
+    """Normalize names for matching coordinates to suburbs"""
+    return tuple(' '.join(str(p).split()).casefold() for p in parts)
+
+def load_coordinates_file(path):
+    """
+    Load city coordinates from a local CSV file with the header
+    country_code,province,city,latitude,longitude (province may be a name or code)
+    """
+    coordinates = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            try:
+                point = (float(row['latitude']), float(row['longitude']))
+            except (TypeError, ValueError):
+                continue
+            country_code = row.get('country_code', '')
+            city = row.get('city', '')
+            coordinates[_location_key(country_code, row.get('province', ''), city)] = point
+            # Fallback key when the file's province doesn't match the crawl
+            coordinates.setdefault(_location_key(country_code, '', city), point)
+    return coordinates
+
+def attach_coordinates(suburbs, coordinates):
+    """Set latitude/longitude on suburbs that don't have them yet; returns the number matched"""
+    matched = 0
+    for suburb in suburbs:
+        if suburb.get('latitude') is not None:
+            matched += 1
+            continue
+        point = (coordinates.get(_location_key(suburb['country_code'], suburb['province_name'], suburb['name']))
+                 or coordinates.get(_location_key(suburb['country_code'], suburb['province_code'], suburb['name']))
+                 or coordinates.get(_location_key(suburb['country_code'], '', suburb['name'])))
+        if point:
+            suburb['latitude'], suburb['longitude'] = point
+            matched += 1
+    return matched
+
+# ============================================================
+# SHARDS: split the crawl across processes/hosts and merge the results
+# ============================================================
+#
+# '--shard i/N' crawls only the countries whose crc32(code) % N == i and
+# appends one JSON line per completed country (every request answered) to
+# its shard file:
+#   {"shard": "i/N", "country": {...}, "provinces": [...], "suburbs": [...]}
+# Re-running the same shard skips countries already in the file, so a shard
+# can be restarted on its own. '--merge-shards' combines shard files into one
+# dataset sorted by natural key, so the output doesn't depend on shard order.
+
+def parse_shard(value):
+    """Parse an 'i/N' shard spec (0 <= i < N)"""
+    try:
+        index, count = (int(v) for v in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like i/N, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..N-1, got {value!r}")
+    return index, count
+
+def shard_of(country_code, shard_count):
+    """Stable shard number of a country (same on every host and Python run)"""
+    return zlib.crc32(country_code.encode('utf-8')) % shard_count
+
+def read_shard_file(path):
+    """Read the completed-country records of a shard file, ignoring a truncated last line"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break  # interrupted mid-write; the country is crawled again
+    return records
+
+def crawl_shard(countries, shard, path):
+    """
+    Crawl this shard's countries in parallel (largest first), checkpointing each
+    completed country to the shard file
+    """
+    shard_index, shard_count = shard
+    mine = [c for c in countries if shard_of(c['code'], shard_count) == shard_index]
+
+    # Rewrite the file with only its valid records so appends start on a clean line
+    records = read_shard_file(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    done = {record['country']['code'] for record in records}
+    todo = [c for c in mine if c['code'] not in done]
+    print(f"Shard {shard_index}/{shard_count}: {len(mine)} countries, {len(done)} already done, {len(todo)} to crawl")
+
+    def crawl_country(country):
+        # One thread per country: the countries themselves are the parallel jobs
+        failed = []
+        provinces = fetch_provinces([country], verbose=False, failed=failed, workers=1)
+        suburbs = fetch_suburbs([country], provinces, verbose=False, failed=failed, workers=1)
+        return provinces, suburbs, failed
+
+    finished = 0
+    with open(path, 'a', encoding='utf-8') as f:
+        def checkpoint(country, result):
+            nonlocal finished
+            if result is None:
+                return  # not started before the crawl deadline
+            finished += 1
+            provinces, suburbs, failed = result
+            if failed:
+                # Only complete countries are checkpointed, so a re-run retries this one
+                # (requests cut off by the crawl deadline count as failed)
+                print(f"  [{finished}/{len(todo)}] {country['name']}: {len(failed)} requests failed - not saved; re-run the shard to retry")
+                return
+            record = {
+                'shard': f"{shard_index}/{shard_count}",
+                'country': country,
+                'provinces': provinces,
+                'suburbs': suburbs,
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+            print(f"  [{finished}/{len(todo)}] {country['name']}: {len(provinces)} provinces, {len(suburbs)} suburbs")
+
+        # Whole countries are scheduled largest-first across the workers, so
+        # the biggest ones don't start last and stretch the shard's tail
+        run_largest_first(todo, estimate_country_crawl_seconds(todo), crawl_country, 'countries',
+                          progress_every=10, on_done=checkpoint)
+
+def merge_shard_files(paths):
+    """Merge shard files into one deterministic, deduplicated dataset"""
+    countries = {}
+    provinces = {}
+    suburbs = {}
+    shards = set()
+
+    for path in paths:
+        for record in read_shard_file(path):
+            shards.add(record.get('shard'))
+            country = record['country']
+            countries.setdefault(country['code'], country)
+            for province in record['provinces']:
+                provinces.setdefault((province['country_code'], province['name']), province)
+            for suburb in record['suburbs']:
+                suburbs.setdefault((suburb['country_code'], suburb['province_name'], suburb['name']), suburb)
+
+    counts = {int(s.split('/')[1]) for s in shards if s}
+    if len(counts) == 1:
+        shard_count = counts.pop()
+        missing = sorted(set(range(shard_count)) - {int(s.split('/')[0]) for s in shards if s})
+        if missing:
+            print(f"WARNING: No records from shard(s) {', '.join(f'{i}/{shard_count}' for i in missing)}")
+    elif len(counts) > 1:
+        print(f"WARNING: Shard files come from different shard counts: {sorted(counts)}")
+
+    return {
+        'countries': [countries[k] for k in sorted(countries)],
+        'provinces': [provinces[k] for k in sorted(provinces)],
+        'suburbs': [suburbs[k] for k in sorted(suburbs)],
+    }
+
+# ============================================================
+# GEONAMES: build the dataset offline from local gazetteer dumps
+# ============================================================
+#
+# Files (https://download.geonames.org/export/dump/), all tab-separated UTF-8:
+#   countryInfo.txt       ISO code -> country name ('#' comment lines)
+#   admin1CodesASCII.txt  'ZA.06' -> 'Gauteng'
+#   allCountries.txt      one row per feature; a per-country dump (ZA.txt) or
+#                         cities500/1000/5000/15000.txt have the same layout
+# The places file can be several GB, so it is memory-mapped and scanned line
+# by line; only rows that pass the feature-class/population filters are decoded.
+
+GEONAMES_COUNTRY_INFO = "countryInfo.txt"
+GEONAMES_ADMIN1_CODES = "admin1CodesASCII.txt"
+GEONAMES_PLACES = "allCountries.txt"
+
+# Column positions in the GeoNames places file
+GEONAMES_NAME = 1
+GEONAMES_LATITUDE = 4
+GEONAMES_LONGITUDE = 5
+GEONAMES_FEATURE_CLASS = 6
+GEONAMES_FEATURE_CODE = 7
+GEONAMES_COUNTRY_CODE = 8
+GEONAMES_ADMIN1_CODE = 10
+GEONAMES_POPULATION = 14
+
+def _mmap_lines(path):
+    """Yield the raw lines of a file through a read-only memory map"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b''):
+                yield line
+
+def read_geonames_countries(path):
+    """Read country rows from countryInfo.txt"""
+    countries = []
+    for line in _mmap_lines(path):
+        if line.startswith(b'#'):
+            continue
+        fields = line.rstrip(b'\r\n').split(b'\t')
+        if len(fields) > 4 and fields[0] and fields[4]:
+            countries.append({'name': fields[4].decode('utf-8'), 'code': fields[0].decode('utf-8')})
+    return countries
+
+def read_geonames_admin1(path):
+    """Read the (country_code, admin1_code) -> province name map from admin1CodesASCII.txt"""
+    admin1 = {}
+    for line in _mmap_lines(path):
+        fields = line.rstrip(b'\r\n').split(b'\t')
+        if len(fields) > 1 and b'.' in fields[0]:
+            country_code, admin1_code = fields[0].decode('utf-8').split('.', 1)
+            admin1[(country_code, admin1_code)] = fields[1].decode('utf-8')
+    return admin1
+
+def read_geonames_places(path, admin1, feature_classes=(b'P',), min_population=0, country_codes=None):
+    """
+    Stream populated places from a GeoNames places file and return suburb rows.
+    When a province has several places with the same name, the most populous wins.
+    """
+    places = {}
+    scanned = 0
+    skipped_admin1 = 0
+
+    for line in _mmap_lines(path):
+        scanned += 1
+        if scanned % 1000000 == 0:
+            print(f"  Progress: {scanned:,} rows scanned, {len(places):,} places kept...")
+
+        fields = line.split(b'\t', GEONAMES_POPULATION + 1)
+        if len(fields) <= GEONAMES_POPULATION or fields[GEONAMES_FEATURE_CLASS] not in feature_classes:
+            continue
+        population = int(fields[GEONAMES_POPULATION] or 0)
+        if population < min_population:
+            continue
+        country_code = fields[GEONAMES_COUNTRY_CODE].decode('utf-8')
+        if country_codes and country_code not in country_codes:
+            continue
+        province_name = admin1.get((country_code, fields[GEONAMES_ADMIN1_CODE].decode('utf-8')))
+        if not province_name:
+            skipped_admin1 += 1
+            continue
+
+        name = fields[GEONAMES_NAME].decode('utf-8')
+        key = (country_code, province_name, name)
+        if key in places and places[key][0] >= population:
+            continue
+        places[key] = (population, float(fields[GEONAMES_LATITUDE]), float(fields[GEONAMES_LONGITUDE]))
+
+    print(f"\n[OK] Scanned {scanned:,} rows, kept {len(places):,} places")
+    if skipped_admin1:
+        print(f"     Places without a known province (admin1) skipped: {skipped_admin1:,}")
+
+    return [
+        {
+            'country_code': country_code,
+            'province_name': province_name,
+            'province_code': '',
+            'name': name,
+            'latitude': latitude,
+            'longitude': longitude,
+        }
+        for (country_code, province_name, name), (_, latitude, longitude) in places.items()
+    ]
+
+def load_geonames_dataset(geonames_dir, places_file=None, feature_classes='P', min_population=0, country_codes=None):
+    """Build the location dataset from GeoNames dump files"""
+    countries = read_geonames_countries(os.path.join(geonames_dir, GEONAMES_COUNTRY_INFO))
+    if country_codes:
+        countries = [c for c in countries if c['code'] in country_codes]
+    print(f"[OK] Read {len(countries)} countries")
+
+    admin1 = read_geonames_admin1(os.path.join(geonames_dir, GEONAMES_ADMIN1_CODES))
+    known_countries = {c['code'] for c in countries}
+    # Provinces are matched by name: GeoNames admin1 codes differ from the
+    # CountriesNow state codes already stored in Province.Code
+    provinces = [
+        {'country_code': country_code, 'name': name, 'code': ''}
+        for (country_code, _), name in sorted(admin1.items())
+        if country_code in known_countries
+    ]
+    print(f"[OK] Read {len(provinces)} provinces")
+
+    suburbs = read_geonames_places(
+        places_file or os.path.join(geonames_dir, GEONAMES_PLACES),
+        admin1,
+        feature_classes=tuple(c.encode('ascii') for c in feature_classes.split(',')),
+        min_population=min_population,
+        country_codes=known_countries,
+    )
+    return {'countries': countries, 'provinces': provinces, 'suburbs': suburbs}
+
+def save_dataset(dataset, path):
+    """Write the crawled dataset to a JSON file so SQL can be regenerated offline"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dataset, f, ensure_ascii=False)
+
+def load_dataset(path):
+    """Load a dataset previously written by save_dataset()"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# ============================================================
+# RENDER: dataset -> SQL
+# ============================================================
+
+def generate_country_inserts(countries, source=DATA_SOURCES['api']['countries']):
+    """
+    Generate SQL INSERT statements for countries. Countries whose Code already
+    exists are skipped, since sources spell names differently (e.g. 'Macao'
+    vs 'Macau') and Code is UNIQUE too.
+    """
     sql = f"""-- ============================================================
 -- COUNTRY DATA INSERT SCRIPT
 -- ============================================================
 -- Generated: {datetime.now().isoformat()}
--- Source: REST Countries API (https://restcountries.com)
+-- Source: {source}
 -- Total Countries: {len(countries)}
 -- ============================================================
 
 INSERT INTO Country (Name, Code, Created_By, Updated_By)
-VALUES
+SELECT v.name, v.code, v.created_by, v.updated_by
+FROM (VALUES
 """
-    
+
     values = []
     for country in countries:
-        name = escape_sql_string(country.get('name', {}).get('common', ''))
-        code = escape_sql_string(country.get('cca2', ''))
-        if name and code:
-            values.append(f"    ('{name}', '{code}', 'system', 'system')")
-    
+        name = escape_sql_string(country['name'])
+        code = escape_sql_string(country['code'])
+        values.append(f"    ('{name}', '{code}', 'system', 'system')")
+
     sql += ',\n'.join(values)
-    sql += "\nON CONFLICT (Name) DO NOTHING;\n\n"
+    sql += "\n) AS v(name, code, created_by, updated_by)\n"
+    sql += "WHERE NOT EXISTS (SELECT 1 FROM Country c WHERE c.Code = v.code)\n"
+    sql += "ON CONFLICT (Name) DO NOTHING;\n\n"
     return sql
 
-def generate_province_inserts(countries_data):
+def generate_province_inserts(provinces, source=DATA_SOURCES['api']['provinces']):
     """Generate SQL INSERT statements for provinces/states - ALL countries"""
     sql = f"""-- ============================================================
 -- PROVINCE/STATE DATA INSERT SCRIPT
 -- ============================================================
 -- Generated: {datetime.now().isoformat()}
--- Source: CountriesNow API (https://countriesnow.space)
+-- Source: {source}
 -- Fetching provinces/states for ALL countries
 -- ============================================================
 
 """
-    
+
     province_values = []
-    total_provinces = 0
-    countries_with_provinces = 0
-    failed_countries = []
-    
-    print(f"Fetching provinces/states for {len(countries_data)} countries...")
-    
-    for idx, country in enumerate(countries_data, 1):
-        country_name = country.get('name', {}).get('common', '')
-        country_code = country.get('cca2', '')
-        
-        if not country_name or not country_code:
-            continue
-        
-        # Progress indicator
-        if idx % 10 == 0:
-            print(f"  Progress: {idx}/{len(countries_data)} countries processed...")
-        
-        # Fetch states for this country
-        encoded_country = urllib.parse.quote(country_name)
-        states_data = fetch_json(f"{STATES_API_BASE}?country={encoded_country}")
-        
-        if states_data:
-            # Handle different response formats
-            states = []
-            if isinstance(states_data, dict):
-                if states_data.get('data'):
-                    if isinstance(states_data['data'], dict) and states_data['data'].get('states'):
-                        states = states_data['data']['states']
-                    elif isinstance(states_data['data'], list):
-                        states = states_data['data']
-                elif states_data.get('states'):
-                    states = states_data['states']
-            elif isinstance(states_data, list):
-                states = states_data
-            
-            if states:
-                countries_with_provinces += 1
-                for state in states:
-                    # Handle both dict and string formats
-                    if isinstance(state, dict):
-                        state_name = escape_sql_string(state.get('name', ''))
-                        state_code = escape_sql_string(state.get('state_code', state.get('code', '')))
-                    else:
-                        state_name = escape_sql_string(state)
-                        state_code = ""
-                    
-                    if state_name:
-                        code_value = f"'{state_code}'" if state_code else "NULL"
-                        province_values.append(
-                            f"    ((SELECT ID FROM Country WHERE Code = '{country_code}' LIMIT 1), '{state_name}', {code_value}, 'system', 'system')"
-                        )
-                        total_provinces += 1
-                
-                # Small delay to avoid rate limiting (reduced for faster processing)
-                time.sleep(0.05)
-            else:
-                failed_countries.append(country_name)
-        else:
-            failed_countries.append(country_name)
-    
-    print(f"\n[OK] Fetched provinces for {countries_with_provinces} countries")
-    print(f"     Total provinces: {total_provinces}")
-    if failed_countries:
-        print(f"     Countries without province data: {len(failed_countries)}")
-    
+    for province in provinces:
+        country_code = escape_sql_string(province['country_code'])
+        state_name = escape_sql_string(province['name'])
+        state_code = escape_sql_string(province['code'])
+        code_value = f"'{state_code}'" if state_code else "NULL"
+        province_values.append(
+            f"    ((SELECT ID FROM Country WHERE Code = '{country_code}' LIMIT 1), '{state_name}', {code_value}, 'system', 'system')"
+        )
+
     if province_values:
-        sql += f"-- Total Provinces: {total_provinces}\n"
+        countries_with_provinces = len({p['country_code'] for p in provinces})
+        sql += f"-- Total Provinces: {len(province_values)}\n"
         sql += f"-- Countries with provinces: {countries_with_provinces}\n\n"
         sql += "INSERT INTO Province (country_id, Name, Code, Created_By, Updated_By)\n"
         sql += "SELECT * FROM (VALUES\n"
@@ -159,214 +1122,902 @@ def generate_province_inserts(countries_data):
         sql += ");\n\n"
     else:
         sql += "-- No province data available\n\n"
-    
-    return sql, countries_data
 
-def generate_suburb_inserts(countries_data):
-    """Generate SQL INSERT statements for suburbs/cities - ALL provinces"""
-    sql = f"""-- ============================================================
+    return sql
+
+def province_id_subquery(suburb):
+    """Render the subquery that resolves a suburb's province_id"""
+    country_code = escape_sql_string(suburb['country_code'])
+
+    # Build province lookup - try code first, then name
+    if suburb['province_code']:
+        province_lookup = f"Code = '{escape_sql_string(suburb['province_code'])}'"
+    else:
+        province_lookup = f"Name = '{escape_sql_string(suburb['province_name'])}'"
+
+    return f"(SELECT ID FROM Province WHERE country_id = (SELECT ID FROM Country WHERE Code = '{country_code}' LIMIT 1) AND ({province_lookup}) LIMIT 1)"
+
+def suburb_value_row(suburb):
+    """Render one suburb as a VALUES row resolving province_id by subquery"""
+    return f"    ({province_id_subquery(suburb)}, '{escape_sql_string(suburb['name'])}', 'system', 'system')"
+
+def suburb_batches(suburbs, batch_rows=SUBURB_BATCH_ROWS):
+    """Yield (country_code, suburbs) batches of at most batch_rows, one country at a time"""
+    by_country = {}
+    for suburb in suburbs:
+        by_country.setdefault(suburb['country_code'], []).append(suburb)
+
+    for country_code in sorted(by_country):
+        country_suburbs = by_country[country_code]
+        for start in range(0, len(country_suburbs), batch_rows):
+            yield country_code, country_suburbs[start:start + batch_rows]
+
+def generate_suburb_inserts(suburbs, partitioned=False, source=DATA_SOURCES['api']['suburbs']):
+    """
+    Generate SQL INSERT statements for suburbs/cities - ALL provinces.
+    Yields the script in chunks, one statement per country batch, so callers
+    can write it out without holding the whole suburb section in memory.
+    """
+    yield f"""-- ============================================================
 -- SUBURB/CITY DATA INSERT SCRIPT
 -- ============================================================
 -- Generated: {datetime.now().isoformat()}
--- Source: CountriesNow API (https://countriesnow.space)
+-- Source: {source}
 -- Fetching cities/suburbs for ALL provinces
 -- ============================================================
 
 """
-    
-    suburb_values = []
-    total_suburbs = 0
-    provinces_processed = 0
-    provinces_with_cities = 0
-    
-    print(f"\nFetching cities/suburbs for all provinces...")
-    print("This may take a while as we fetch cities for each province...")
-    
-    # First, get all provinces for each country
-    country_provinces_map = {}
-    
-    for country in countries_data:
-        country_name = country.get('name', {}).get('common', '')
-        country_code = country.get('cca2', '')
-        
-        if not country_name or not country_code:
-            continue
-        
-        # Fetch states for this country
-        encoded_country = urllib.parse.quote(country_name)
-        states_data = fetch_json(f"{STATES_API_BASE}?country={encoded_country}")
-        
-        if states_data:
-            states = []
-            if isinstance(states_data, dict):
-                if states_data.get('data'):
-                    if isinstance(states_data['data'], dict) and states_data['data'].get('states'):
-                        states = states_data['data']['states']
-                    elif isinstance(states_data['data'], list):
-                        states = states_data['data']
-            elif isinstance(states_data, list):
-                states = states_data
-            
-            if states:
-                country_provinces_map[country_code] = {
-                    'name': country_name,
-                    'provinces': states
-                }
-        
-        time.sleep(0.1)  # Rate limiting
-    
-    # Now fetch cities for each province
-    total_provinces_to_process = sum(len(v['provinces']) for v in country_provinces_map.values())
-    current_province = 0
-    
-    for country_code, country_info in country_provinces_map.items():
-        country_name = country_info['name']
-        provinces = country_info['provinces']
-        
-        for province in provinces:
-            current_province += 1
-            
-            # Progress indicator
-            if current_province % 20 == 0:
-                print(f"  Progress: {current_province}/{total_provinces_to_process} provinces processed...")
-            
-            # Get province name
-            if isinstance(province, dict):
-                province_name = province.get('name', '')
-                province_code = province.get('state_code', province.get('code', ''))
-            else:
-                province_name = str(province)
-                province_code = ""
-            
-            if not province_name:
-                continue
-            
-            # Fetch cities for this province
-            encoded_country = urllib.parse.quote(country_name)
-            encoded_province = urllib.parse.quote(province_name)
-            cities_data = fetch_json(f"{CITIES_API_BASE}?country={encoded_country}&state={encoded_province}")
-            
-            provinces_processed += 1
-            
-            if cities_data:
-                cities = []
-                if isinstance(cities_data, dict):
-                    if cities_data.get('data'):
-                        if isinstance(cities_data['data'], list):
-                            cities = cities_data['data']
-                elif isinstance(cities_data, list):
-                    cities = cities_data
-                
-                if cities:
-                    provinces_with_cities += 1
-                    for city in cities:
-                        city_name = escape_sql_string(city)
-                        if city_name:
-                            # Build province lookup - try code first, then name
-                            province_lookup = ""
-                            if province_code:
-                                province_lookup = f"Code = '{province_code}'"
-                            else:
-                                province_lookup = f"Name = '{escape_sql_string(province_name)}'"
-                            
-                            suburb_values.append(
-                                f"    ((SELECT ID FROM Province WHERE country_id = (SELECT ID FROM Country WHERE Code = '{country_code}' LIMIT 1) AND ({province_lookup}) LIMIT 1), '{city_name}', 'system', 'system')"
-                            )
-                            total_suburbs += 1
-            
-            # Rate limiting (reduced delay for faster processing)
-            time.sleep(0.1)
-    
-    print(f"\n[OK] Processed {provinces_processed} provinces")
-    print(f"     Provinces with cities: {provinces_with_cities}")
-    print(f"     Total cities/suburbs: {total_suburbs}")
-    
-    if suburb_values:
-        sql += f"-- Total Suburbs/Cities: {total_suburbs}\n"
-        sql += f"-- Provinces processed: {provinces_processed}\n"
-        sql += f"-- Provinces with cities: {provinces_with_cities}\n\n"
-        sql += "INSERT INTO Suburb (province_id, Name, Created_By, Updated_By)\n"
-        sql += "SELECT * FROM (VALUES\n"
-        sql += ',\n'.join(suburb_values)
+
+    if not suburbs:
+        yield "-- No suburb data available\n\n"
+        return
+
+    if partitioned:
+        yield from generate_partitioned_suburb_inserts(suburbs)
+        return
+
+    provinces_with_cities = len({(s['country_code'], s['province_name']) for s in suburbs})
+    yield f"-- Total Suburbs/Cities: {len(suburbs)}\n"
+    yield f"-- Provinces with cities: {provinces_with_cities}\n\n"
+
+    for country_code, batch in suburb_batches(suburbs):
+        # suburb_next_id() (schema.sql) draws from the province's country block
+        # once Suburb is partitioned, so these rows never pile into suburb_legacy
+        sql = f"-- {country_code}: {len(batch)} suburbs\n"
+        sql += "INSERT INTO Suburb (ID, province_id, Name, Created_By, Updated_By)\n"
+        sql += "SELECT suburb_next_id(v.province_id), v.province_id, v.name, v.created_by, v.updated_by\nFROM (VALUES\n"
+        sql += ',\n'.join(suburb_value_row(suburb) for suburb in batch)
         sql += "\n) AS v(province_id, name, created_by, updated_by)\n"
         sql += "WHERE NOT EXISTS (\n"
         sql += "    SELECT 1 FROM Suburb s\n"
         sql += "    WHERE s.province_id = v.province_id AND s.Name = v.name\n"
         sql += ");\n\n"
-    else:
-        sql += "-- No suburb data available\n\n"
-    
+        yield sql
+
+def generate_partitioned_suburb_inserts(suburbs):
+    """
+    Generate Suburb INSERTs per country batch for the country-partitioned layout.
+    IDs are drawn from the country's partition sequence, so every statement
+    writes to a single partition. Duplicates can only be in that partition or
+    in suburb_legacy (see the invariant in partition_suburb_by_country.sql),
+    so the check is limited to those two.
+    """
+    yield f"-- Total Suburbs/Cities: {len(suburbs)}\n"
+    yield f"-- Countries (partitions): {len({s['country_code'] for s in suburbs})}\n\n"
+
+    for country_code, batch in suburb_batches(suburbs):
+        sql = f"-- {country_code}: {len(batch)} suburbs\n"
+        sql += f"WITH c AS (SELECT ID FROM Country WHERE Code = '{escape_sql_string(country_code)}' LIMIT 1)\n"
+        sql += "INSERT INTO Suburb (ID, province_id, Name, Created_By, Updated_By)\n"
+        sql += "SELECT nextval((suburb_partition_name(c.ID) || '_id_seq')::regclass), v.province_id, v.name, v.created_by, v.updated_by\n"
+        sql += "FROM c CROSS JOIN (VALUES\n"
+        sql += ',\n'.join(suburb_value_row(suburb) for suburb in batch)
+        sql += "\n) AS v(province_id, name, created_by, updated_by)\n"
+        sql += "WHERE NOT EXISTS (\n"
+        sql += "    SELECT 1 FROM Suburb s\n"
+        sql += "    WHERE s.province_id = v.province_id AND s.Name = v.name\n"
+        sql += "    AND (s.ID < 1000000 OR s.ID >= suburb_id_block(c.ID) AND s.ID < suburb_id_block(c.ID) + 1000000)\n"
+        sql += ");\n\n"
+        yield sql
+
+def generate_suburb_partition_sql(migration_path=SUBURB_PARTITION_MIGRATION):
+    """Generate SQL that converts Suburb to per-country partitions and creates any missing partitions"""
+    with open(migration_path, 'r', encoding='utf-8') as f:
+        migration = f.read()
+
+    sql = f"""-- ============================================================
+-- SUBURB PARTITIONING (one partition per country)
+-- ============================================================
+-- Generated: {datetime.now().isoformat()}
+-- Source: backend/src/migrations/partition_suburb_by_country.sql
+-- ============================================================
+
+{migration}
+-- Create partitions for countries inserted by this script
+SELECT ensure_suburb_partition(ID) FROM Country ORDER BY ID;
+
+"""
+    return sql
+
+def generate_geography_dimension_sql(migration_path=GEOGRAPHY_DIM_MIGRATION):
+    """Generate SQL for the denormalized geography dimension used by reports/dashboards"""
+    with open(migration_path, 'r', encoding='utf-8') as f:
+        migration = f.read()
+
+    sql = f"""-- ============================================================
+-- GEOGRAPHY DIMENSION (Suburb -> Province -> Country)
+-- ============================================================
+-- Generated: {datetime.now().isoformat()}
+-- Source: backend/src/migrations/geography_dim.sql
+-- ============================================================
+
+{migration}
+-- Refresh step: re-run after every location load (safe while reports are reading)
+REFRESH MATERIALIZED VIEW CONCURRENTLY Geography_Dim;
+ANALYZE Geography_Dim;
+
+"""
     return sql
 
+def generate_suburb_coordinates_sql(suburbs, partitioned=False):
+    """
+    Generate SQL that stores suburb coordinates and the GiST index used for
+    nearest-N queries, yielded in per-country batches like the inserts.
+    Nothing is emitted when no suburb has coordinates.
+    """
+    located = [s for s in suburbs if s.get('latitude') is not None and s.get('longitude') is not None]
+    if not located:
+        return
+
+    yield f"""-- ============================================================
+-- SUBURB COORDINATES
+-- ============================================================
+-- Generated: {datetime.now().isoformat()}
+-- Nearest-N suburbs use the earthdistance GiST index (KNN ordering, no
+-- full scan). ll_to_earth() maps lat/lon onto the earth sphere and cube's
+-- <-> is the chord length, which orders exactly like great-circle
+-- distance, so this matches the --spatial-index k-d tree:
+--   SELECT ID, Name,
+--          earth_distance(ll_to_earth(Latitude, Longitude), ll_to_earth(<lat>, <lon>)) / 1000 AS km
+--   FROM Suburb
+--   WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL
+--   ORDER BY ll_to_earth(Latitude, Longitude) <-> ll_to_earth(<lat>, <lon>)
+--   LIMIT 10;
+-- Without cube/earthdistance the coordinates still load, just unindexed.
+-- ============================================================
+
+ALTER TABLE Suburb
+ADD COLUMN IF NOT EXISTS Latitude DOUBLE PRECISION,
+ADD COLUMN IF NOT EXISTS Longitude DOUBLE PRECISION;
+
+-- Replaces the planar point(Longitude, Latitude) index of earlier versions
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS cube;
+    CREATE EXTENSION IF NOT EXISTS earthdistance;
+    CREATE INDEX IF NOT EXISTS idx_suburb_earth ON Suburb USING gist (ll_to_earth(Latitude, Longitude))
+    WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL;
+    DROP INDEX IF EXISTS idx_suburb_location;
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'idx_suburb_earth not created, earthdistance unavailable: %', SQLERRM;
+END $$;
+
+"""
+    yield f"-- Suburbs with coordinates: {len(located)}\n\n"
+
+    for country_code, batch in suburb_batches(located):
+        sql = f"-- {country_code}: {len(batch)} suburbs\n"
+        if partitioned:
+            sql += f"WITH c AS (SELECT ID FROM Country WHERE Code = '{escape_sql_string(country_code)}' LIMIT 1)\n"
+        sql += "UPDATE Suburb s\n"
+        sql += "SET Latitude = v.latitude, Longitude = v.longitude, Updated_By = 'system', Updated_At = now()\n"
+        sql += "FROM c, (VALUES\n" if partitioned else "FROM (VALUES\n"
+        sql += ',\n'.join(
+            f"    ({province_id_subquery(suburb)}, '{escape_sql_string(suburb['name'])}', {float(suburb['latitude'])!r}, {float(suburb['longitude'])!r})"
+            for suburb in batch
+        )
+        sql += "\n) AS v(province_id, name, latitude, longitude)\n"
+        sql += "WHERE s.province_id = v.province_id AND s.Name = v.name\n"
+        if partitioned:
+            sql += "AND (s.ID < 1000000 OR s.ID >= suburb_id_block(c.ID) AND s.ID < suburb_id_block(c.ID) + 1000000)\n"
+        sql += "AND (s.Latitude IS DISTINCT FROM v.latitude OR s.Longitude IS DISTINCT FROM v.longitude);\n\n"
+        yield sql
+
+# ============================================================
+# SPATIAL INDEX: k-d tree artifact for nearest-suburb lookups
+# ============================================================
+#
+# Points are stored as 3-D unit vectors so straight-line (chord) distance
+# orders neighbours exactly like great-circle distance. The tree is implicit:
+# for a slice [lo, hi) of 'points' the node is at (lo + hi) // 2, split on
+# axis depth % 3, with the left subtree in [lo, mid) and the right in (mid, hi).
+
+EARTH_RADIUS_KM = 6371.0088
+
+def _unit_vector(latitude, longitude):
+    """Convert latitude/longitude in degrees to a 3-D unit vector"""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+def build_spatial_index(suburbs):
+    """Build the k-d tree artifact over all suburbs that have coordinates"""
+    items = [
+        (_unit_vector(s['latitude'], s['longitude']),
+         [s['latitude'], s['longitude'], s['country_code'], s['province_name'], s['name']])
+        for s in suburbs
+        if s.get('latitude') is not None and s.get('longitude') is not None
+    ]
+
+    stack = [(0, len(items), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= 1:
+            continue
+        axis = depth % 3
+        items[lo:hi] = sorted(items[lo:hi], key=lambda item: item[0][axis])
+        mid = (lo + hi) // 2
+        stack.append((lo, mid, depth + 1))
+        stack.append((mid + 1, hi, depth + 1))
+
+    return {
+        'kind': 'kdtree-unit-sphere',
+        'generated': datetime.now().isoformat(),
+        'count': len(items),
+        'fields': ['latitude', 'longitude', 'country_code', 'province', 'name'],
+        'points': [entry for _, entry in items],
+    }
+
+def save_spatial_index(index, path):
+    """Write the spatial index artifact to a JSON file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+
+def load_spatial_index(path):
+    """Load a spatial index artifact written by save_spatial_index()"""
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    index['vectors'] = [_unit_vector(p[0], p[1]) for p in index['points']]
+    return index
+
+def nearest_suburbs(index, latitude, longitude, count=10):
+    """Return the nearest suburbs to a point as (distance_km, point) tuples, closest first"""
+    vectors = index.get('vectors') or [_unit_vector(p[0], p[1]) for p in index['points']]
+    target = _unit_vector(latitude, longitude)
+    best = []  # max-heap of (-squared chord distance, position)
+
+    stack = [(0, len(vectors), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if lo >= hi:
+            continue
+        mid = (lo + hi) // 2
+        vector = vectors[mid]
+        distance = sum((a - b) ** 2 for a, b in zip(vector, target))
+        if len(best) < count:
+            heapq.heappush(best, (-distance, mid))
+        elif distance < -best[0][0]:
+            heapq.heapreplace(best, (-distance, mid))
+
+        axis = depth % 3
+        diff = target[axis] - vector[axis]
+        near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+        # Visit the far side only if the splitting plane is closer than the current worst match
+        if len(best) < count or diff * diff < -best[0][0]:
+            stack.append((far[0], far[1], depth + 1))
+        stack.append((near[0], near[1], depth + 1))
+
+    results = []
+    for negative_distance, position in sorted(best, reverse=True):
+        chord = math.sqrt(-negative_distance)
+        results.append((2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2)), index['points'][position]))
+    return results
+
+# ============================================================
+# VERSION: dataset version stamp and change feed for cache invalidation
+# ============================================================
+#
+# The load script snapshots (entity, ID, Name) of Country/Province/Suburb
+# before any change and, at the end, writes one Location_Dataset_Version row
+# plus a Location_Change_Log row per added/removed/renamed ID. The backend
+# polls MAX(Location_Dataset_Version.ID) and patches its lookup cache from the
+# change log instead of re-reading the full tables.
+
+LOCATION_VERSION_TABLES_SQL = """CREATE TABLE IF NOT EXISTS Location_Dataset_Version (
+    ID BIGSERIAL PRIMARY KEY,
+    Checksum VARCHAR(64),  -- NULL for single edits made through the lookup API
+    Source VARCHAR(50),
+    Country_Count INTEGER,
+    Province_Count INTEGER,
+    Suburb_Count INTEGER,
+    Created_By VARCHAR(255),
+    Created_At TIMESTAMPTZ NOT NULL DEFAULT now(),
+    Updated_By VARCHAR(255),
+    Updated_At TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS Location_Change_Log (
+    ID BIGSERIAL PRIMARY KEY,
+    Version_ID BIGINT NOT NULL,
+    Entity VARCHAR(20) NOT NULL,
+    Entity_ID BIGINT NOT NULL,
+    Change_Type VARCHAR(10) NOT NULL,
+    Old_Name VARCHAR(255),
+    New_Name VARCHAR(255),
+    Created_At TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT fk_location_change_log_version FOREIGN KEY (Version_ID) REFERENCES Location_Dataset_Version(ID) ON DELETE CASCADE,
+    CONSTRAINT chk_location_change_log_entity CHECK (Entity IN ('Country', 'Province', 'Suburb')),
+    CONSTRAINT chk_location_change_log_type CHECK (Change_Type IN ('added', 'removed', 'renamed', 'updated'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_location_change_log_version ON Location_Change_Log(Version_ID);
+
+-- Tables created before lookup API edits were logged
+ALTER TABLE Location_Dataset_Version ALTER COLUMN Checksum DROP NOT NULL;
+ALTER TABLE Location_Change_Log DROP CONSTRAINT IF EXISTS chk_location_change_log_type;
+ALTER TABLE Location_Change_Log ADD CONSTRAINT chk_location_change_log_type
+    CHECK (Change_Type IN ('added', 'removed', 'renamed', 'updated'));
+"""
+
+def dataset_checksum(dataset):
+    """SHA-256 of the dataset content, independent of key order"""
+    canonical = json.dumps(dataset, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def generate_location_snapshot_sql():
+    """Generate SQL that snapshots location IDs/names before the load changes them"""
+    sql = f"""-- ============================================================
+-- LOCATION SNAPSHOT (for the change log written at the end)
+-- ============================================================
+-- Generated: {datetime.now().isoformat()}
+-- Run this whole script in one session: the snapshot is a temp table.
+-- ============================================================
+
+{LOCATION_VERSION_TABLES_SQL}
+DROP TABLE IF EXISTS location_snapshot;
+CREATE TEMP TABLE location_snapshot AS
+SELECT 'Country'::text AS entity, ID::bigint AS id, Name FROM Country
+UNION ALL
+SELECT 'Province', ID, Name FROM Province
+UNION ALL
+SELECT 'Suburb', ID, Name FROM Suburb;
+
+"""
+    return sql
+
+def generate_dataset_version_sql(dataset, source):
+    """Generate SQL that records this load as a new dataset version with its change log"""
+    checksum = dataset_checksum(dataset)
+    sql = f"""-- ============================================================
+-- LOCATION DATASET VERSION AND CHANGE LOG
+-- ============================================================
+-- Generated: {datetime.now().isoformat()}
+-- Backend caches poll: SELECT MAX(ID) FROM Location_Dataset_Version;
+-- The version row is written even when nothing changed (data-modifying
+-- CTEs always run to completion).
+-- ============================================================
+
+WITH version AS (
+    INSERT INTO Location_Dataset_Version (Checksum, Source, Country_Count, Province_Count, Suburb_Count, Created_By, Updated_By)
+    SELECT '{checksum}', '{escape_sql_string(source)}',
+           (SELECT COUNT(*) FROM Country), (SELECT COUNT(*) FROM Province), (SELECT COUNT(*) FROM Suburb),
+           'system', 'system'
+    RETURNING ID
+),
+current_rows AS (
+    SELECT 'Country'::text AS entity, ID::bigint AS id, Name FROM Country
+    UNION ALL
+    SELECT 'Province', ID, Name FROM Province
+    UNION ALL
+    SELECT 'Suburb', ID, Name FROM Suburb
+)
+INSERT INTO Location_Change_Log (Version_ID, Entity, Entity_ID, Change_Type, Old_Name, New_Name)
+SELECT version.ID,
+       COALESCE(c.entity, o.entity),
+       COALESCE(c.id, o.id),
+       CASE WHEN o.id IS NULL THEN 'added' WHEN c.id IS NULL THEN 'removed' ELSE 'renamed' END,
+       o.Name,
+       c.Name
+FROM version
+CROSS JOIN (current_rows c FULL OUTER JOIN location_snapshot o ON o.entity = c.entity AND o.id = c.id)
+WHERE o.id IS NULL OR c.id IS NULL OR o.Name IS DISTINCT FROM c.Name;
+
+DROP TABLE IF EXISTS location_snapshot;
+
+"""
+    return sql
+
+# ============================================================
+# VALIDATE: check the dataset against schema.sql before loading
+# ============================================================
+
+LOCATION_TABLES = ('country', 'province', 'suburb')
+
+# Columns written by the generated INSERT statements, per table
+INSERT_COLUMNS = {
+    'country': ('name', 'code', 'created_by', 'updated_by'),
+    'province': ('country_id', 'name', 'code', 'created_by', 'updated_by'),
+    'suburb': ('province_id', 'name', 'created_by', 'updated_by'),
+}
+
+# Unique keys the INSERT statements already tolerate duplicates for
+# (ON CONFLICT target) - duplicates there are skipped, not fatal
+CONFLICT_TARGETS = {
+    'country': ('name',),
+}
+
+def _split_top_level(body):
+    """Split a SQL fragment on commas that are not nested inside parentheses"""
+    parts = []
+    depth = 0
+    current = []
+    for ch in body:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+def _read_parenthesized(text, open_idx):
+    """Return the text between the parenthesis at open_idx and its match"""
+    depth = 0
+    for idx in range(open_idx, len(text)):
+        if text[idx] == '(':
+            depth += 1
+        elif text[idx] == ')':
+            depth -= 1
+            if depth == 0:
+                return text[open_idx + 1:idx]
+    return text[open_idx + 1:]
+
+def _apply_column(table_name, table, definition):
+    """Record a column definition such as 'Name VARCHAR(255) UNIQUE NOT NULL'"""
+    match = re.match(r'(\w+)\s+(\w+)(?:\s*\(\s*(\d+)\s*\))?(.*)$', definition, re.I | re.S)
+    if not match:
+        return
+    column = match.group(1).lower()
+    rest = match.group(4).upper()
+    table['columns'][column] = {
+        'type': match.group(2).upper(),
+        'length': int(match.group(3)) if match.group(3) else None,
+        'not_null': 'NOT NULL' in rest or 'PRIMARY KEY' in rest,
+    }
+    if re.search(r'\bUNIQUE\b', rest):
+        table['unique'][f"{table_name}_{column}_key"] = (column,)
+
+def _apply_unique(table_name, table, name, columns):
+    """Record a UNIQUE constraint"""
+    columns = tuple(c.strip().lower() for c in columns.split(','))
+    name = name.lower() if name else f"{table_name}_{'_'.join(columns)}_key"
+    table['unique'][name] = columns
+
+def _apply_table_element(table_name, table, element):
+    """Record one element of a CREATE TABLE body"""
+    constraint = re.match(r'(?:CONSTRAINT\s+(\w+)\s+)?UNIQUE\s*\(([^)]*)\)', element, re.I)
+    if constraint:
+        _apply_unique(table_name, table, constraint.group(1), constraint.group(2))
+    elif not re.match(r'(CONSTRAINT|PRIMARY|FOREIGN|CHECK|UNIQUE)\b', element, re.I):
+        _apply_column(table_name, table, element)
+
+def load_schema_constraints(schema_path=SCHEMA_FILE):
+    """
+    Parse Country/Province/Suburb column lengths, NOT NULL flags and UNIQUE
+    keys from schema.sql, including later ALTER TABLE migrations
+    """
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        text = re.sub(r'--[^\n]*', '', f.read())
+
+    tables = {}
+    for match in re.finditer(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\(', text, re.I):
+        table_name = match.group(1).lower()
+        if table_name not in LOCATION_TABLES:
+            continue
+        table = tables.setdefault(table_name, {'columns': {}, 'unique': {}})
+        for element in _split_top_level(_read_parenthesized(text, match.end() - 1)):
+            _apply_table_element(table_name, table, element)
+
+    for match in re.finditer(r'ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(\w+)\s+(.*?);', text, re.I | re.S):
+        table_name = match.group(1).lower()
+        if table_name not in tables:
+            continue
+        table = tables[table_name]
+        for clause in _split_top_level(match.group(2)):
+            add_column = re.match(r'ADD\s+COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?(.*)$', clause, re.I | re.S)
+            add_unique = re.match(r'ADD\s+CONSTRAINT\s+(\w+)\s+UNIQUE\s*\(([^)]*)\)', clause, re.I)
+            drop = re.match(r'DROP\s+CONSTRAINT\s+(?:IF\s+EXISTS\s+)?(\w+)\s*$', clause, re.I)
+            if add_column:
+                _apply_column(table_name, table, add_column.group(1))
+            elif add_unique:
+                _apply_unique(table_name, table, add_unique.group(1), add_unique.group(2))
+            elif drop:
+                table['unique'].pop(drop.group(1).lower(), None)
+
+    return tables
+
+def _dataset_rows(dataset):
+    """
+    Map dataset entries to the column values they produce, per table.
+    Parent foreign keys are represented by the natural key the subquery
+    resolves them with.
+    """
+    province_index = {}
+    for idx, province in enumerate(dataset['provinces']):
+        province_index.setdefault(('name', province['country_code'], province['name']), []).append(idx)
+        if province['code']:
+            province_index.setdefault(('code', province['country_code'], province['code']), []).append(idx)
+
+    rows = {'country': [], 'province': [], 'suburb': []}
+    for country in dataset['countries']:
+        rows['country'].append({'name': country['name'], 'code': country['code']})
+    for province in dataset['provinces']:
+        rows['province'].append({
+            'country_id': province['country_code'],
+            'name': province['name'],
+            'code': province['code'] or None,
+        })
+    for suburb in dataset['suburbs']:
+        if suburb['province_code']:
+            lookup = ('code', suburb['country_code'], suburb['province_code'])
+        else:
+            lookup = ('name', suburb['country_code'], suburb['province_name'])
+        matches = province_index.get(lookup, [])
+        rows['suburb'].append({
+            'province_id': matches[0] if len(matches) == 1 else None,
+            'name': suburb['name'],
+            '_lookup': lookup,
+            '_matches': len(matches),
+        })
+    return rows
+
+def validate_location_dataset(dataset, schema_path=SCHEMA_FILE):
+    """
+    Check every generated row against the constraints declared in schema.sql.
+    Returns a list of (severity, check, message) tuples; any 'error' means the
+    load would fail (or silently insert orphaned rows) and should not be run.
+    """
+    schema = load_schema_constraints(schema_path)
+    issues = []
+
+    def report(severity, check, message):
+        issues.append((severity, check, message))
+
+    rows = _dataset_rows(dataset)
+    country_codes = {c['code'] for c in dataset['countries']}
+
+    for table_name in LOCATION_TABLES:
+        table = schema.get(table_name)
+        if table is None:
+            report('error', 'table', f"{table_name}: table not declared in schema.sql")
+            continue
+
+        # Columns the INSERT statements and lookup subqueries rely on
+        for column in INSERT_COLUMNS[table_name]:
+            if column not in table['columns']:
+                report('error', 'column', f"{table_name}.{column}: used by generated INSERT but not declared in schema.sql")
+
+        for idx, row in enumerate(rows[table_name]):
+            for column, value in row.items():
+                spec = table['columns'].get(column)
+                if spec is None or column.endswith('_id'):
+                    continue
+                if value is None or value == '':
+                    if spec['not_null']:
+                        report('error', 'not_null', f"{table_name}[{idx}].{column}: empty value for NOT NULL column")
+                elif spec['length'] is not None and len(value) > spec['length']:
+                    report('error', 'length', f"{table_name}[{idx}].{column}: {len(value)} chars exceeds VARCHAR({spec['length']}): {value[:60]!r}")
+
+        for constraint, columns in table['unique'].items():
+            if not rows[table_name] or not all(c in rows[table_name][0] for c in columns):
+                continue
+            seen = {}
+            tolerated = columns == CONFLICT_TARGETS.get(table_name)
+            for idx, row in enumerate(rows[table_name]):
+                key = tuple(row[c] for c in columns)
+                if any(v is None or v == '' for v in key):
+                    continue  # NULLs never conflict
+                if key in seen:
+                    severity = 'warning' if tolerated else 'error'
+                    report(severity, 'unique', f"{table_name}[{idx}] duplicates row {seen[key]} on {constraint} {columns}: {key}")
+                else:
+                    seen[key] = idx
+
+    # Coordinates
+    for idx, suburb in enumerate(dataset['suburbs']):
+        latitude = suburb.get('latitude')
+        longitude = suburb.get('longitude')
+        if latitude is None and longitude is None:
+            continue
+        if latitude is None or longitude is None or not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+            report('error', 'coordinates', f"suburb[{idx}] {suburb['name'][:60]!r}: invalid coordinates ({latitude}, {longitude})")
+
+    # Resolvable parents
+    for idx, row in enumerate(rows['province']):
+        if row['country_id'] not in country_codes:
+            report('error', 'parent', f"province[{idx}] {row['name'][:60]!r}: country code {row['country_id']!r} not in dataset (country_id would be NULL)")
+    for idx, row in enumerate(rows['suburb']):
+        kind, country_code, key = row['_lookup']
+        if row['_matches'] == 0:
+            report('error', 'parent', f"suburb[{idx}] {row['name'][:60]!r}: no province with {kind} {key!r} in {country_code} (province_id would be NULL)")
+        elif row['_matches'] > 1:
+            report('error', 'parent', f"suburb[{idx}] {row['name'][:60]!r}: province {kind} {key!r} is ambiguous in {country_code} ({row['_matches']} matches)")
+
+    return issues
+
+def print_validation_report(issues, samples=10):
+    """Print a summary of validation issues grouped by severity and check"""
+    groups = {}
+    for severity, check, message in issues:
+        groups.setdefault((severity, check), []).append(message)
+    for (severity, check), messages in sorted(groups.items()):
+        print(f"  [{severity.upper()}] {check}: {len(messages)}")
+        for message in messages[:samples]:
+            print(f"      {message}")
+        if len(messages) > samples:
+            print(f"      ... {len(messages) - samples} more")
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Generate Country/Province/Suburb SQL insert script")
+    parser.add_argument('--output', default="country_province_suburb_inserts.sql", help="SQL file to write")
+    parser.add_argument('--schema', default=SCHEMA_FILE, help="schema.sql used by the pre-load validator")
+    parser.add_argument('--save-dataset', help="also write the crawled dataset to this JSON file")
+    parser.add_argument('--load-dataset', help="skip the crawl and generate from a saved dataset JSON file")
+    parser.add_argument('--shard', type=parse_shard, metavar='i/N',
+                        help="crawl only shard i of N (0-based) into a restartable shard file; no SQL is written")
+    parser.add_argument('--shard-file', help="shard file to write (default: location_shard_<i>_of_<N>.jsonl)")
+    parser.add_argument('--merge-shards', nargs='+', metavar='FILE', help="generate from the merged contents of shard files")
+    parser.add_argument('--source', choices=('api', 'geonames'), default='api',
+                        help="crawl the public APIs, or import local GeoNames dump files (default: %(default)s)")
+    parser.add_argument('--geonames-dir', default='.',
+                        help=f"directory with {GEONAMES_COUNTRY_INFO}, {GEONAMES_ADMIN1_CODES} and {GEONAMES_PLACES}")
+    parser.add_argument('--geonames-places', help="places file to use instead of allCountries.txt (e.g. cities1000.txt, ZA.txt)")
+    parser.add_argument('--feature-classes', default='P', help="comma separated GeoNames feature classes to import (default: %(default)s)")
+    parser.add_argument('--min-population', type=int, default=0, help="skip GeoNames places below this population")
+    parser.add_argument('--countries', help="comma separated ISO country codes to restrict the GeoNames import to")
+    parser.add_argument('--validate-only', action='store_true', help="validate the dataset and exit without writing SQL")
+    parser.add_argument('--skip-validation', action='store_true', help="write SQL even if the validator reports errors")
+    parser.add_argument('--partition-suburbs', action='store_true', help="emit the country-partitioned Suburb layout and per-country inserts")
+    parser.add_argument('--request-budget', type=float, default=FETCH_SETTINGS['request_budget'],
+                        help="seconds one API call may spend across retries and hedges (default: %(default)s)")
+    parser.add_argument('--hedge', action='store_true',
+                        help="send a duplicate API request when the first is slower than the observed p95")
+    parser.add_argument('--crawl-deadline', type=float,
+                        help="stop starting new API requests after this many seconds and finalize from completed data")
+    parser.add_argument('--workers', type=int, default=CRAWL_SETTINGS['workers'],
+                        help="concurrent API requests, scheduled longest-first (default: %(default)s)")
+    parser.add_argument('--crawl-stats', default=CRAWL_STATS_FILE,
+                        help="per-country/province crawl statistics read for scheduling and updated after the crawl; "
+                             "shards write their own <name>.shard<i>of<N> file next to it (default: %(default)s)")
+    parser.add_argument('--coordinates-file', help="CSV of country_code,province,city,latitude,longitude to attach to suburbs")
+    parser.add_argument('--spatial-index', help="write (or with --nearest, read) the k-d tree spatial index JSON artifact")
+    parser.add_argument('--nearest', nargs=2, type=float, metavar=('LAT', 'LON'),
+                        help="print the nearest suburbs from --spatial-index and exit")
+    args = parser.parse_args()
+    if args.nearest:
+        latitude, longitude = args.nearest
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            parser.error(f"--nearest: {latitude} {longitude} is not a valid LAT LON (-90..90, -180..180)")
+        if not args.spatial_index:
+            parser.error("--nearest requires --spatial-index")
+    return args
+
 def main():
     """Main function to generate SQL script"""
+    args = parse_args()
+
+    if args.nearest:
+        latitude, longitude = args.nearest
+        index = load_spatial_index(args.spatial_index)
+        for distance, point in nearest_suburbs(index, latitude, longitude):
+            print(f"  {distance:9.2f} km  {point[4]}, {point[3]}, {point[2]} ({point[0]}, {point[1]})")
+        return
+
+    FETCH_SETTINGS['request_budget'] = args.request_budget
+    FETCH_SETTINGS['hedge'] = args.hedge
+    if args.crawl_deadline:
+        FETCH_SETTINGS['crawl_deadline'] = time.monotonic() + args.crawl_deadline
+    CRAWL_SETTINGS['workers'] = max(1, args.workers)
+    CRAWL_SETTINGS['stats'] = load_crawl_stats(args.crawl_stats)
+    if args.hedge:
+        start_fetch_pool()
+
     print("=" * 70)
     print("Generating COMPLETE Country, Province, and Suburb SQL Insert Script")
-    print("Fetching ALL data from APIs (not just major countries)")
+    if args.merge_shards or args.load_dataset:
+        print("Generating from previously crawled data")
+    elif args.source == 'geonames':
+        print("Importing ALL data from local GeoNames dump files")
+    else:
+        print("Fetching ALL data from APIs (not just major countries)")
     print("=" * 70)
-    
-    # Fetch countries
-    print("\n[1/3] Fetching ALL countries from REST Countries API...")
-    countries_data = fetch_json(COUNTRIES_API)
-    
-    if not countries_data:
-        print("ERROR: Failed to fetch countries data")
+
+    if args.shard:
+        shard_file = args.shard_file or f"location_shard_{args.shard[0]}_of_{args.shard[1]}.jsonl"
+        print(f"\n[1/2] Fetching ALL countries from REST Countries API...")
+        countries_data = fetch_json(COUNTRIES_API)
+
+        if not countries_data:
+            print("ERROR: Failed to fetch countries data")
+            return
+
+        print(f"\n[2/2] Crawling shard {args.shard[0]}/{args.shard[1]} into {shard_file}...")
+        crawl_shard(collect_countries(countries_data), args.shard, shard_file)
+        print_fetch_metrics()
+        stats_file = save_crawl_stats(CRAWL_SETTINGS['stats'], args.crawl_stats, shard=args.shard)
+        print(f"\n[OK] Crawl statistics saved to {stats_file}")
+        print(f"[SUCCESS] Shard file written: {shard_file}")
+        print("          Combine all shards with --merge-shards to generate the SQL script.\n")
         return
-    
-    print(f"[OK] Fetched {len(countries_data)} countries")
-    
-    # Generate country inserts
-    country_sql = generate_country_inserts(countries_data)
-    
-    # Generate province inserts (ALL countries)
-    print("\n[2/3] Generating province/state inserts for ALL countries...")
-    province_sql, countries = generate_province_inserts(countries_data)
-    
-    # Generate suburb inserts (ALL provinces)
-    print("\n[3/3] Generating suburb/city inserts for ALL provinces...")
-    suburb_sql = generate_suburb_inserts(countries_data)
-    
-    # Combine all SQL
-    final_sql = country_sql + province_sql + suburb_sql
-    final_sql += """-- ============================================================
+
+    if args.merge_shards:
+        print(f"\n[1-3/3] Merging {len(args.merge_shards)} shard files...")
+        dataset = merge_shard_files(args.merge_shards)
+        print(f"[OK] Merged {len(dataset['countries'])} countries, {len(dataset['provinces'])} provinces, {len(dataset['suburbs'])} suburbs")
+    elif args.load_dataset:
+        print(f"\n[1-3/3] Loading dataset from {args.load_dataset}...")
+        dataset = load_dataset(args.load_dataset)
+        print(f"[OK] Loaded {len(dataset['countries'])} countries, {len(dataset['provinces'])} provinces, {len(dataset['suburbs'])} suburbs")
+    elif args.source == 'geonames':
+        print(f"\n[1-3/3] Importing GeoNames dump files from {args.geonames_dir}...")
+        started = time.time()
+        dataset = load_geonames_dataset(
+            args.geonames_dir,
+            places_file=args.geonames_places,
+            feature_classes=args.feature_classes,
+            min_population=args.min_population,
+            country_codes=set(args.countries.split(',')) if args.countries else None,
+        )
+        print(f"[OK] Imported {len(dataset['suburbs'])} suburbs in {time.time() - started:.1f}s")
+    else:
+        # Fetch countries
+        print("\n[1/3] Fetching ALL countries from REST Countries API...")
+        countries_data = fetch_json(COUNTRIES_API)
+
+        if not countries_data:
+            print("ERROR: Failed to fetch countries data")
+            return
+
+        countries = collect_countries(countries_data)
+        print(f"[OK] Fetched {len(countries)} countries")
+
+        # Fetch provinces (ALL countries)
+        print("\n[2/3] Fetching province/state data for ALL countries...")
+        provinces = fetch_provinces(countries)
+
+        # Fetch suburbs (ALL provinces)
+        print("\n[3/3] Fetching suburb/city data for ALL provinces...")
+        suburbs = fetch_suburbs(countries, provinces)
+
+        dataset = {'countries': countries, 'provinces': provinces, 'suburbs': suburbs}
+        print_fetch_metrics()
+        save_crawl_stats(CRAWL_SETTINGS['stats'], args.crawl_stats)
+        print(f"[OK] Crawl statistics saved to {args.crawl_stats} (used to schedule the next run)")
+        if crawl_deadline_reached():
+            print("\nNOTE: Crawl deadline reached - output contains only the data fetched before it")
+
+    if args.coordinates_file:
+        matched = attach_coordinates(dataset['suburbs'], load_coordinates_file(args.coordinates_file))
+        print(f"\n[OK] Coordinates attached to {matched}/{len(dataset['suburbs'])} suburbs")
+
+    if args.save_dataset:
+        save_dataset(dataset, args.save_dataset)
+        print(f"\n[OK] Dataset saved to {args.save_dataset}")
+
+    # Validate every row against schema.sql before anything touches the database
+    print(f"\nValidating dataset against {os.path.normpath(args.schema)}...")
+    started = time.time()
+    issues = validate_location_dataset(dataset, args.schema)
+    errors = [i for i in issues if i[0] == 'error']
+    print(f"[{'OK' if not errors else 'FAILED'}] Validation finished in {time.time() - started:.2f}s: "
+          f"{len(errors)} errors, {len(issues) - len(errors)} warnings")
+    print_validation_report(issues)
+
+    if args.validate_only:
+        return
+    if errors and not args.skip_validation:
+        print("\nERROR: Dataset rejected by validator - SQL not written (use --skip-validation to override)")
+        return
+
+    # Version stamp source and per-table source labels for the SQL headers
+    if args.merge_shards:
+        source = 'shards'
+        labels = DATA_SOURCES['api']
+    elif args.load_dataset:
+        source = 'dataset'
+        labels = dict.fromkeys(DATA_SOURCES['api'], f"saved dataset {os.path.basename(args.load_dataset)}")
+    else:
+        source = args.source
+        labels = DATA_SOURCES[args.source]
+
+    # Combine all SQL. Suburb sections are generators, written batch by batch
+    footer = f"""-- ============================================================
 -- END OF LOCATION DATA INSERT SCRIPT
 -- ============================================================
--- 
+--
 -- Instructions:
 -- 1. Review the generated data above
 -- 2. Append this script to your schema.sql file or run it separately
--- 3. The script uses ON CONFLICT DO NOTHING to prevent duplicates
+-- 3. The script uses ON CONFLICT DO NOTHING / NOT EXISTS to prevent duplicates
+--    (countries are matched on Code, so differently spelled names are skipped)
 -- 4. Foreign key relationships are preserved through subqueries
 -- 5. All records are created with WHO columns (created_by='system', updated_by='system')
--- 
+-- 6. Geography_Dim is refreshed at the end of this script; after any other
+--    change to Country/Province/Suburb run:
+--    REFRESH MATERIALIZED VIEW CONCURRENTLY Geography_Dim;
+-- 7. With --partition-suburbs, Suburb is partitioned per country
+--    (suburb_c<Country.ID>); a single country can be reloaded by
+--    re-running only its INSERT statement above. Without it, suburb IDs
+--    come from suburb_next_id() in schema.sql, which also follows the
+--    country blocks on an already partitioned database.
+-- 8. Suburb coordinates (when available) are indexed with GiST for
+--    nearest-N queries if cube/earthdistance can be installed, see
+--    SUBURB COORDINATES above.
+-- 9. Use --source geonames to import from local GeoNames dumps
+--    (https://www.geonames.org) instead of the APIs.
+-- 10. Run the script in a single session: it snapshots Country/Province/
+--    Suburb first and records a Location_Dataset_Version row plus the
+--    added/removed/renamed IDs in Location_Change_Log at the end.
+--
 -- Data Sources:
--- - Countries: REST Countries API (https://restcountries.com) - ALL countries
--- - Provinces: CountriesNow API (https://countriesnow.space) - ALL countries with provinces
--- - Suburbs: CountriesNow API (https://countriesnow.space) - ALL provinces with cities
--- 
--- Note: This script fetches ALL available data, not just major countries.
--- Execution time may vary based on API response times and rate limits.
+-- - Countries: {labels['countries']} - ALL countries
+-- - Provinces: {labels['provinces']} - ALL countries with provinces
+-- - Suburbs: {labels['suburbs']} - ALL provinces with cities
 -- ============================================================
 """
-    
+
+    sections = [
+        generate_location_snapshot_sql(),
+        generate_country_inserts(dataset['countries'], source=labels['countries']),
+        generate_province_inserts(dataset['provinces'], source=labels['provinces']),
+    ]
+    if args.partition_suburbs:
+        sections.append(generate_suburb_partition_sql())
+    sections += [
+        generate_suburb_inserts(dataset['suburbs'], partitioned=args.partition_suburbs, source=labels['suburbs']),
+        generate_suburb_coordinates_sql(dataset['suburbs'], partitioned=args.partition_suburbs),
+        # Denormalized geography dimension for reporting rollups
+        generate_geography_dimension_sql(),
+        # Version stamp + change log, written last so caches see a fully loaded dataset
+        generate_dataset_version_sql(dataset, source),
+        footer,
+    ]
+
+    if args.spatial_index:
+        index = build_spatial_index(dataset['suburbs'])
+        save_spatial_index(index, args.spatial_index)
+        print(f"\n[OK] Spatial index with {index['count']} suburbs written to {args.spatial_index}")
+
     # Write to file
-    output_file = "country_province_suburb_inserts.sql"
+    output_file = args.output
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(final_sql)
-    
+        for section in sections:
+            if isinstance(section, str):
+                f.write(section)
+            else:
+                f.writelines(section)
+
     print("\n" + "=" * 70)
     print(f"[SUCCESS] SQL script generated successfully: {output_file}")
     print("=" * 70)
     print("\nSummary:")
-    print(f"  - Countries: {len(countries_data)} (ALL countries)")
-    print(f"  - Provinces: Fetched for ALL countries with available data")
-    print(f"  - Suburbs: Fetched for ALL provinces with available data")
+    print(f"  - Countries: {len(dataset['countries'])} (ALL countries)")
+    print(f"  - Provinces: {len(dataset['provinces'])} (ALL countries with available data)")
+    print(f"  - Suburbs: {len(dataset['suburbs'])} (ALL provinces with available data)")
+    print(f"  - Geography_Dim: Denormalized suburb/province/country view (refreshed on load)")
+    if args.partition_suburbs:
+        print(f"  - Suburb layout: Partitioned per country (suburb_c<Country.ID>)")
     print(f"  - File ready to append to schema.sql")
     print(f"  - Safe migration: Uses ON CONFLICT DO NOTHING")
     print(f"  - WHO columns: All records include audit fields")
     print("\nNote: This is a comprehensive dataset with ALL available data.")
-    print("      File size may be large depending on API data availability.\n")
+    print("      File size may be large depending on source data availability.\n")
 
 if __name__ == "__main__":
     main()
-